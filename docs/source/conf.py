@@ -22,6 +22,12 @@ A Sphinx extension that generates a summary llms.txt file,written in Markdown,
 and a single combined documentation llms-full.txt file, written in reStructuredText.
 """
 
+# Variants of llms.txt linking to the Markdown and reStructuredText builds
+llms_txt_uri_variants = [
+    ("llms.md.txt", "{base_url}{docname}.html.md"),
+    ("llms.rst.txt", "{base_url}{docname}.rst"),
+]
+
 # This doesn't seem to be supported
 # rst_file_suffix = ".html.rst"
 markdown_file_suffix = ".html.md"
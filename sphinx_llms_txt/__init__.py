@@ -19,6 +19,7 @@ from sphinx.application import Sphinx
 from .collector import DocumentCollector
 from .manager import LLMSFullManager
 from .processor import DocumentProcessor
+from .snapshot import plan, regenerate, write_snapshot
 from .writer import FileWriter
 
 __version__ = "0.7.1"
@@ -29,19 +30,23 @@ __all__ = [
     "DocumentProcessor",
     "FileWriter",
     "LLMSFullManager",
+    "plan",
+    "regenerate",
 ]
 
 # Global manager instance
 _manager = LLMSFullManager()
 
-# Store root document first paragraph
-_root_first_paragraph = ""
+# Store root document first paragraph, None until the root is resolved
+_root_first_paragraph = None
 
 
 def doctree_resolved(app: Sphinx, doctree, docname: str):
     """Called when a docname has been resolved to a document."""
     global _root_first_paragraph
 
+    _manager.mark_page_resolved(docname)
+
     # Check for llms-txt-ignore metadata at the page level
     if hasattr(app.env, "metadata") and docname in app.env.metadata:
         metadata = app.env.metadata[docname]
@@ -49,22 +54,22 @@ def doctree_resolved(app: Sphinx, doctree, docname: str):
             _manager.mark_page_ignored(docname)
             return
 
-    # Extract title from the document
-    title = None
-    # findall() returns a generator, convert to list to check if it has elements
-    title_nodes = list(doctree.findall(nodes.title))
-    if title_nodes:
-        title = title_nodes[0].astext()
-
-    if title:
-        _manager.update_page_title(docname, title)
-
-    # Extract first paragraph from root document
-    if docname == app.config.master_doc:
-        for node in doctree.traverse(nodes.paragraph):
+    # Titles are read from env.titles in build_finished, so the only thing
+    # needed from the doctree is the first paragraph of the root document,
+    # and of every page if page descriptions are enabled.
+    # findall() is lazy, so this stops at the first non-empty paragraph.
+    is_root = docname == app.config.master_doc
+    capture_description = app.config.llms_txt_page_descriptions
+    if is_root:
+        _root_first_paragraph = ""
+    if is_root or capture_description:
+        for node in doctree.findall(nodes.paragraph):
             first_para = node.astext()
             if first_para:
-                _root_first_paragraph = first_para
+                if is_root:
+                    _root_first_paragraph = first_para
+                if capture_description:
+                    _manager.update_page_description(docname, first_para)
                 break
 
 
@@ -79,27 +84,49 @@ def build_finished(app: Sphinx, exception):
         # Get the summary - use configured value or extracted first paragraph
         summary = app.config.llms_txt_summary
         if summary is None:
-            summary = _root_first_paragraph
+            summary = _manager.restore_root_paragraph(_root_first_paragraph)
 
         # Set up configuration
         config = {
             "llms_txt_file": app.config.llms_txt_file,
             "llms_txt_filename": app.config.llms_txt_filename,
             "llms_txt_uri_template": app.config.llms_txt_uri_template,
+            "llms_txt_uri_variants": app.config.llms_txt_uri_variants,
             "llms_txt_title": app.config.llms_txt_title,
             "llms_txt_summary": summary,
+            "llms_txt_page_descriptions": app.config.llms_txt_page_descriptions,
+            "llms_txt_link_hashes": app.config.llms_txt_link_hashes,
+            "llms_txt_index_depth": app.config.llms_txt_index_depth,
+            "llms_txt_index_max_entries": app.config.llms_txt_index_max_entries,
             "llms_txt_full_file": app.config.llms_txt_full_file,
             "llms_txt_full_filename": app.config.llms_txt_full_filename,
             "llms_txt_full_max_size": app.config.llms_txt_full_max_size,
             "llms_txt_full_size_policy": app.config.llms_txt_full_size_policy,
+            "llms_txt_full_compress": app.config.llms_txt_full_compress,
+            "llms_txt_full_compress_level": app.config.llms_txt_full_compress_level,
+            "llms_txt_full_priorities": app.config.llms_txt_full_priorities,
+            "llms_txt_full_tiers": app.config.llms_txt_full_tiers,
+            "llms_txt_full_index": app.config.llms_txt_full_index,
+            "llms_txt_full_sections": app.config.llms_txt_full_sections,
+            "llms_txt_full_delta": app.config.llms_txt_full_delta,
+            "llms_txt_full_shard_size": app.config.llms_txt_full_shard_size,
+            "llms_txt_full_shard_unit": app.config.llms_txt_full_shard_unit,
+            "llms_txt_full_shard_boundary": app.config.llms_txt_full_shard_boundary,
             "llms_txt_directives": app.config.llms_txt_directives,
             "llms_txt_exclude": app.config.llms_txt_exclude,
+            "llms_txt_exclude_toctree": app.config.llms_txt_exclude_toctree,
+            "llms_txt_exclude_metadata": app.config.llms_txt_exclude_metadata,
             "llms_txt_code_files": app.config.llms_txt_code_files,
             "llms_txt_code_base_path": app.config.llms_txt_code_base_path,
+            "llms_txt_cache_dir": app.config.llms_txt_cache_dir,
+            "llms_txt_snapshot": app.config.llms_txt_snapshot,
             "html_baseurl": getattr(app.config, "html_baseurl", ""),
         }
         _manager.set_config(config)
 
+        # Evaluate metadata filters once, including pages not rewritten this build
+        _manager.apply_metadata_filters()
+
         # Get final titles from the environment at build completion
         if hasattr(app.env, "titles"):
             for docname, title_node in app.env.titles.items():
@@ -107,9 +134,19 @@ def build_finished(app: Sphinx, exception):
                     title = title_node.astext()
                     _manager.update_page_title(docname, title)
 
+        # A description metadata field takes precedence over the first paragraph
+        if app.config.llms_txt_page_descriptions and hasattr(app.env, "metadata"):
+            for docname, metadata in app.env.metadata.items():
+                if metadata.get("description"):
+                    _manager.update_page_description(docname, metadata["description"])
+
         # Create the combined file
         _manager.combine_sources(app.outdir, app.srcdir)
 
+        # Save what's needed to regenerate the files without a Sphinx build
+        if app.config.llms_txt_snapshot:
+            write_snapshot(_manager, app.outdir)
+
 
 def setup(app: Sphinx) -> Dict[str, Any]:
     """Set up the Sphinx extension."""
@@ -117,16 +154,35 @@ def setup(app: Sphinx) -> Dict[str, Any]:
     app.add_config_value("llms_txt_file", True, "env")
     app.add_config_value("llms_txt_filename", "llms.txt", "env")
     app.add_config_value("llms_txt_uri_template", None, "env")
+    app.add_config_value("llms_txt_uri_variants", [], "env")
+    app.add_config_value("llms_txt_index_depth", None, "env")
+    app.add_config_value("llms_txt_index_max_entries", None, "env")
     app.add_config_value("llms_txt_full_file", True, "env")
     app.add_config_value("llms_txt_full_filename", "llms-full.txt", "env")
     app.add_config_value("llms_txt_full_max_size", None, "env")
     app.add_config_value("llms_txt_full_size_policy", "warn_skip", "env")
+    app.add_config_value("llms_txt_full_compress", [], "env")
+    app.add_config_value("llms_txt_full_compress_level", None, "env")
+    app.add_config_value("llms_txt_full_priorities", {}, "env")
+    app.add_config_value("llms_txt_full_tiers", {}, "env")
+    app.add_config_value("llms_txt_full_index", False, "env")
+    app.add_config_value("llms_txt_full_sections", False, "env")
+    app.add_config_value("llms_txt_full_delta", False, "env")
+    app.add_config_value("llms_txt_full_shard_size", None, "env")
+    app.add_config_value("llms_txt_full_shard_unit", "bytes", "env")
+    app.add_config_value("llms_txt_full_shard_boundary", "size", "env")
     app.add_config_value("llms_txt_directives", [], "env")
     app.add_config_value("llms_txt_title", None, "env")
     app.add_config_value("llms_txt_summary", None, "env")
+    app.add_config_value("llms_txt_page_descriptions", False, "env")
+    app.add_config_value("llms_txt_link_hashes", False, "env")
     app.add_config_value("llms_txt_exclude", [], "env")
+    app.add_config_value("llms_txt_exclude_toctree", [], "env")
+    app.add_config_value("llms_txt_exclude_metadata", {}, "env")
     app.add_config_value("llms_txt_code_files", [], "env")
     app.add_config_value("llms_txt_code_base_path", None, "env")
+    app.add_config_value("llms_txt_cache_dir", None, "env")
+    app.add_config_value("llms_txt_snapshot", False, "env")
 
     def builder_inited(app):
         """Used to limit what builders are allowed to run the extension."""
@@ -136,7 +192,7 @@ def setup(app: Sphinx) -> Dict[str, Any]:
             # Reset manager and root paragraph for each build
             global _manager, _root_first_paragraph
             _manager = LLMSFullManager()
-            _root_first_paragraph = ""
+            _root_first_paragraph = None
 
             app.connect("doctree-resolved", doctree_resolved)
             app.connect("build-finished", build_finished)
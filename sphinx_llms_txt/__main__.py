@@ -0,0 +1,9 @@
+"""
+Entry point for ``python -m sphinx_llms_txt``.
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
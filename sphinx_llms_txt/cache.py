@@ -0,0 +1,336 @@
+"""
+Build cache module for sphinx-llms-txt.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "llms-txt-cache.json"
+PAGE_ORDER_FILENAME = "llms-txt-page-order.json"
+DESCRIPTIONS_FILENAME = "llms-txt-descriptions.json"
+ROOT_PARAGRAPH_FILENAME = "llms-txt-root-paragraph.json"
+MANIFEST_FILENAME = "llms-txt-manifest.json"
+PAGES_DIRNAME = "llms-txt-pages"
+CACHE_VERSION = 2
+
+
+def get_cache_dir(app) -> Optional[Path]:
+    """Get the directory used to persist state between builds.
+
+    Returns:
+        The Sphinx doctree directory, or None if it isn't available
+    """
+    doctreedir = getattr(app, "doctreedir", None) if app else None
+    return Path(doctreedir) if doctreedir else None
+
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of a string encoded as UTF-8."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """Return the hash of a text file's content, or None if it can't be read.
+
+    The file is decoded the same way the processor reads it, so the result is
+    comparable with :func:`hash_text` of the content it saw.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return hash_text(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def load_json(path: Path) -> Dict[str, Any]:
+    """Load a JSON object from a file, returning an empty dict on any error."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_text_atomic(path: Path, text: str):
+    """Atomically write text to a file, creating its directory if needed."""
+    # Imported here since the writer module depends on this one
+    from .writer import AtomicOutputFile
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with AtomicOutputFile(path) as f:
+        f.write(text)
+
+
+def save_json(path: Path, data: Dict[str, Any]) -> bool:
+    """Atomically write a JSON object to a file.
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        write_text_atomic(path, json.dumps(data))
+        return True
+    except Exception as e:
+        logger.debug(f"sphinx-llms-txt: Could not write cache file {path}: {e}")
+        return False
+
+
+def remove_stale_outputs(
+    cache_dir: Optional[Path], outdir: Path, key: str, paths: Iterable[Path]
+):
+    """Record the files written under a key, removing those no longer written.
+
+    Only files the previous build listed under the same key are removed, so
+    files put in the output directory by anything else are left alone.
+
+    Args:
+        cache_dir: Directory holding the manifest, or None to skip cleanup
+        outdir: Output directory the paths are relative to
+        key: Name of the group of files, e.g. ``sections``
+        paths: Files written under the key by this build
+    """
+    if not cache_dir:
+        return
+    outdir = Path(outdir)
+    manifest_path = cache_dir / MANIFEST_FILENAME
+    manifest = load_json(manifest_path)
+    current = sorted(Path(path).relative_to(outdir).as_posix() for path in paths)
+    previous = manifest.get(key)
+    previous = previous if isinstance(previous, list) else []
+
+    for relpath in set(previous) - set(current):
+        path = outdir / relpath
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"sphinx-llms-txt: Could not remove {path}: {e}")
+        # Remove directories left empty, e.g. when the option was turned off
+        if path.parent != outdir:
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
+
+    if current != previous:
+        manifest[key] = current
+        save_json(manifest_path, manifest)
+
+
+class ProcessedPageCache:
+    """Persists processed page content and the include dependency graph.
+
+    A cached page is reused when its source content is unchanged and none of
+    the include files it pulled in have changed since the previous build.
+    Processed content is kept one file per page in a ContentAddressedStore
+    next to the index, and nothing is written when the cache is unchanged.
+    """
+
+    def __init__(self, cache_dir: Optional[Path], config_hash: str = ""):
+        self.path = Path(cache_dir) / CACHE_FILENAME if cache_dir else None
+        self.store = (
+            ContentAddressedStore(Path(cache_dir) / PAGES_DIRNAME)
+            if cache_dir
+            else None
+        )
+        self.config_hash = config_hash
+        # docname -> {"source": source hash, "content": processed content hash}
+        self.pages: Dict[str, Dict[str, str]] = {}
+        # include file -> docnames that include it
+        self.include_graph: Dict[str, Set[str]] = {}
+        # docname -> include files it pulled in
+        self.page_includes: Dict[str, Set[str]] = {}
+        # include file -> content hash (None if the file was missing)
+        self.include_hashes: Dict[str, Optional[str]] = {}
+        self.invalidated: Set[str] = set()
+        # Whether the index differs from what is on disk
+        self.dirty = False
+
+    def load(self):
+        """Load the cache and invalidate pages whose includes have changed."""
+        if not self.path:
+            return
+
+        data = load_json(self.path)
+        if (
+            data.get("version") != CACHE_VERSION
+            or data.get("config") != self.config_hash
+        ):
+            # Replace a stale cache file on the next save
+            self.dirty = self.path.exists()
+            return
+
+        self.pages = data.get("pages", {})
+        self.include_graph = {
+            path: set(docnames)
+            for path, docnames in data.get("include_graph", {}).items()
+        }
+        for include_path, docnames in self.include_graph.items():
+            for docname in docnames:
+                self.page_includes.setdefault(docname, set()).add(include_path)
+        self.include_hashes = data.get("include_hashes", {})
+
+        for include_path, old_hash in list(self.include_hashes.items()):
+            new_hash = hash_file(Path(include_path))
+            if new_hash != old_hash:
+                dependents = self.include_graph.get(include_path, set())
+                logger.debug(
+                    f"sphinx-llms-txt: Include {include_path} changed, "
+                    f"invalidating {sorted(dependents)}"
+                )
+                self.invalidated.update(dependents)
+                # Drop stale entries so they can't be reused once the new
+                # include hash is saved
+                for docname in dependents:
+                    self.pages.pop(docname, None)
+                self.include_hashes[include_path] = new_hash
+                self.dirty = True
+
+    def get(self, docname: str, source_hash: str) -> Optional[str]:
+        """Return cached processed content for a page, if still valid."""
+        if docname in self.invalidated or not self.store:
+            return None
+        entry = self.pages.get(docname)
+        if entry and entry.get("source") == source_hash:
+            return self.store.get(entry.get("content", ""))
+        return None
+
+    def put(
+        self,
+        docname: str,
+        source_hash: str,
+        content: str,
+        includes: Dict[str, Optional[str]],
+    ):
+        """Store processed content for a page along with its include files.
+
+        Args:
+            docname: The document name
+            source_hash: Hash of the unprocessed source content
+            content: The processed content
+            includes: Mapping of include file paths to their content hashes
+        """
+        if not self.store:
+            return
+
+        entry = {"source": source_hash, "content": hash_text(content)}
+        if self.pages.get(docname) != entry:
+            self.store.put(entry["content"], content)
+            self.pages[docname] = entry
+            self.dirty = True
+        self.invalidated.discard(docname)
+
+        new_includes = set(includes)
+        old_includes = self.page_includes.get(docname, set())
+        if new_includes != old_includes:
+            self._remove_edges(docname, old_includes - new_includes)
+            self.page_includes[docname] = new_includes
+            self.dirty = True
+        for include_path, include_hash in includes.items():
+            self.include_graph.setdefault(include_path, set()).add(docname)
+            if self.include_hashes.get(include_path, False) != include_hash:
+                self.include_hashes[include_path] = include_hash
+                self.dirty = True
+
+    def _remove_edges(self, docname: str, include_paths: Iterable[str]):
+        """Remove a document from the dependents of some include files."""
+        for include_path in include_paths:
+            dependents = self.include_graph.get(include_path)
+            if dependents is not None:
+                dependents.discard(docname)
+                if not dependents:
+                    del self.include_graph[include_path]
+
+    def dependents(self, include_path: str) -> Set[str]:
+        """Return the docnames that include the given file."""
+        return set(self.include_graph.get(include_path, set()))
+
+    def save(self, docnames: Optional[Iterable[str]] = None):
+        """Write the cache to disk, if it changed.
+
+        Args:
+            docnames: If given, only entries for these documents are kept
+        """
+        if not self.path:
+            return
+
+        if docnames is not None:
+            keep = set(docnames)
+            for docname in [d for d in self.pages if d not in keep]:
+                del self.pages[docname]
+                self.dirty = True
+            for docname in [d for d in self.page_includes if d not in keep]:
+                self._remove_edges(docname, self.page_includes.pop(docname))
+                self.dirty = True
+
+        if not self.dirty:
+            return
+
+        include_graph = {
+            path: sorted(dependents)
+            for path, dependents in sorted(self.include_graph.items())
+            if dependents
+        }
+        data = {
+            "version": CACHE_VERSION,
+            "config": self.config_hash,
+            "pages": dict(sorted(self.pages.items())),
+            "include_graph": include_graph,
+            "include_hashes": {
+                path: self.include_hashes.get(path) for path in include_graph
+            },
+        }
+        if save_json(self.path, data):
+            self.store.prune(entry["content"] for entry in self.pages.values())
+            self.dirty = False
+
+
+class ContentAddressedStore:
+    """A directory of processed pages keyed by everything that determines them.
+
+    Keys are built from content hashes and machine-independent paths, so the
+    directory can be saved and restored across CI runners, unlike the
+    ProcessedPageCache kept with the doctrees.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the processed content stored under a key, if any."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8", newline="") as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def put(self, key: str, content: str):
+        """Store processed content under a key."""
+        path = self._path(key)
+        if path.exists():
+            return
+        try:
+            write_text_atomic(path, content)
+        except OSError as e:
+            logger.debug(f"sphinx-llms-txt: Could not write to cache {path}: {e}")
+
+    def prune(self, keys: Iterable[str]):
+        """Remove everything but the given keys from the store."""
+        keep = {f"{key}.txt" for key in keys}
+        for path in self.root.glob("*/*.txt"):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.debug(f"sphinx-llms-txt: Could not remove {path}: {e}")
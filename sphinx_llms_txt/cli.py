@@ -0,0 +1,101 @@
+"""
+Command line interface for sphinx-llms-txt.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from .snapshot import plan, regenerate
+
+
+def _parse_overrides(
+    parser: argparse.ArgumentParser, overrides: List[str]
+) -> Dict[str, Any]:
+    """Parse ``name=value`` overrides, reading values as JSON when possible."""
+    config = {}
+    for override in overrides:
+        name, separator, value = override.partition("=")
+        if not separator:
+            parser.error(
+                f"-D option argument must be in the form name=value: {override}"
+            )
+        try:
+            config[name] = json.loads(value)
+        except ValueError:
+            config[name] = value
+    return config
+
+
+def _setup_logging(verbose: bool):
+    """Print sphinx-llms-txt log messages to stderr, unless already set up."""
+    sphinx_logger = logging.getLogger("sphinx")
+    if sphinx_logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    sphinx_logger.addHandler(handler)
+    sphinx_logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Regenerate the llms files of an existing HTML build.
+
+    Returns:
+        The process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sphinx_llms_txt",
+        description=(
+            "Regenerate llms.txt and llms-full.txt from an existing Sphinx HTML "
+            "build made with llms_txt_snapshot = True."
+        ),
+    )
+    parser.add_argument("outdir", help="HTML output directory of the build")
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help=(
+            "build snapshot file, by default llms-txt-snapshot.json in the "
+            "doctree directory next to or inside the output directory"
+        ),
+    )
+    parser.add_argument(
+        "-D",
+        dest="overrides",
+        action="append",
+        default=[],
+        metavar="name=value",
+        help=(
+            "override a configuration value; values are read as JSON when "
+            "possible, e.g. -D llms_txt_full_max_size=5000"
+        ),
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help=(
+            "print a JSON report of what llms-full.txt would contain and the "
+            "projected size policy outcome, without writing anything"
+        ),
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="show debug messages"
+    )
+    args = parser.parse_args(argv)
+
+    overrides = _parse_overrides(parser, args.overrides)
+    _setup_logging(args.verbose)
+
+    try:
+        if args.plan:
+            report = plan(args.outdir, overrides, args.snapshot)
+            print(json.dumps(report, indent=2))
+        else:
+            regenerate(args.outdir, overrides, args.snapshot)
+    except (OSError, ValueError) as e:
+        print(f"sphinx-llms-txt: {e}", file=sys.stderr)
+        return 1
+    return 0
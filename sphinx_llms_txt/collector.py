@@ -3,23 +3,73 @@ Document collector module for sphinx-llms-txt.
 """
 
 import fnmatch
-from typing import Any, Dict, List, Tuple
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from sphinx.environment import BuildEnvironment
 from sphinx.util import logging
 
+from .cache import PAGE_ORDER_FILENAME, get_cache_dir, hash_text, load_json, save_json
+
 logger = logging.getLogger(__name__)
 
 
+class DocnameTrie:
+    """Path-segment trie over docnames.
+
+    Each node keeps the docnames below it in insertion order, so every
+    document under a directory can be enumerated without scanning all docs.
+    """
+
+    def __init__(self, docnames: Iterable[str] = ()):
+        # Each node is a tuple of (children by segment, docnames below the node)
+        self.root: Tuple[Dict[str, tuple], List[str]] = ({}, [])
+        for docname in docnames:
+            self.add(docname)
+
+    def add(self, docname: str):
+        """Add a docname to every directory node along its path."""
+        node = self.root
+        for segment in docname.split("/")[:-1]:
+            children = node[0]
+            if segment not in children:
+                children[segment] = ({}, [])
+            node = children[segment]
+            node[1].append(docname)
+
+    def docs_under(self, prefix: str) -> List[str]:
+        """Get all docnames below a directory prefix, in insertion order.
+
+        Args:
+            prefix: Directory path such as "api/v1" (no trailing slash)
+
+        Returns:
+            List of docnames in that directory and its subdirectories
+        """
+        node = self.root
+        for segment in prefix.split("/"):
+            node = node[0].get(segment)
+            if node is None:
+                return []
+        return node[1]
+
+
 class DocumentCollector:
     """Collects and orders documentation sources based on toctree structure."""
 
     def __init__(self):
         self.page_titles: Dict[str, str] = {}
+        self.page_descriptions: Dict[str, str] = {}
         self.master_doc: str = None
         self.env: BuildEnvironment = None
         self.config: Dict[str, Any] = {}
         self.app = None
+        # Compiled exclusion filter, built on first use
+        self._exclude_regex: Optional[re.Pattern] = None
+        self._excluded_docnames: Optional[Set[str]] = None
+        self.metadata_excluded: Set[str] = set()
 
     def set_master_doc(self, master_doc: str):
         """Set the master document name."""
@@ -28,15 +78,24 @@ class DocumentCollector:
     def set_env(self, env: BuildEnvironment):
         """Set the Sphinx environment."""
         self.env = env
+        self._excluded_docnames = None
 
     def update_page_title(self, docname: str, title: str):
         """Update the title for a page."""
         if title:
             self.page_titles[docname] = title
 
+    def update_page_description(self, docname: str, description: str):
+        """Update the description for a page, collapsed to a single line."""
+        description = " ".join(description.split()) if description else ""
+        if description:
+            self.page_descriptions[docname] = description
+
     def set_config(self, config: Dict[str, Any]):
         """Set configuration options."""
         self.config = config
+        self._exclude_regex = None
+        self._excluded_docnames = None
 
     def set_app(self, app):
         """Set the Sphinx application reference."""
@@ -60,10 +119,39 @@ class DocumentCollector:
         else:
             return [source_suffix]  # String format
 
+    def _get_env_docname_suffix(self, docname: str) -> Optional[str]:
+        """Determine the source suffix for a docname from the Sphinx environment.
+
+        The environment already knows which source file each document was read
+        from, so this resolves the suffix without touching the filesystem.
+
+        Args:
+            docname: The document name to check
+
+        Returns:
+            The source suffix if known, or None otherwise
+        """
+        if not hasattr(self.env, "doc2path"):
+            return None
+
+        try:
+            source_path = Path(self.env.doc2path(docname, False)).as_posix()
+        except Exception as e:
+            logger.debug(f"sphinx-llms-txt: Could not resolve path for {docname}: {e}")
+            return None
+
+        for src_suffix in self._get_source_suffixes():
+            if source_path == f"{docname}{src_suffix}":
+                return src_suffix
+
+        return None
+
     def _get_docname_suffix(self, docname: str, sources_dir) -> str:
         """
-        Determine the source suffix for a given docname by checking which
-        file exists.
+        Determine the source suffix for a given docname.
+
+        The suffix is looked up in the Sphinx environment first. Checking which
+        file exists in the _sources directory is only used as a fallback.
 
         Args:
             docname: The document name to check
@@ -72,7 +160,14 @@ class DocumentCollector:
         Returns:
             The source suffix if found, or None if no matching file exists
         """
-        if not sources_dir or not sources_dir.exists():
+        if not sources_dir:
+            return None
+
+        src_suffix = self._get_env_docname_suffix(docname)
+        if src_suffix is not None:
+            return src_suffix
+
+        if not sources_dir.exists():
             return None
 
         # Get the source link suffix from Sphinx config
@@ -102,11 +197,61 @@ class DocumentCollector:
 
         return None
 
-    def get_page_order(self, sources_dir=None) -> List[Tuple[str, str]]:
+    def _get_page_order_fingerprint(self, sources_dir=None) -> str:
+        """Fingerprint everything the computed page order depends on.
+
+        Args:
+            sources_dir: Optional path to _sources directory for suffix detection
+
+        Returns:
+            A hash of the toctree structure, documents and relevant config
+        """
+        all_docs = sorted(getattr(self.env, "all_docs", {}).keys())
+        dependencies = getattr(self.env, "dependencies", {})
+        source_link_suffix = None
+        if self.app and hasattr(self.app.config, "html_sourcelink_suffix"):
+            source_link_suffix = self.app.config.html_sourcelink_suffix
+
+        return hash_text(
+            json.dumps(
+                {
+                    "master_doc": self.master_doc,
+                    "all_docs": all_docs,
+                    "toctree_includes": {
+                        docname: list(children)
+                        for docname, children in sorted(
+                            getattr(self.env, "toctree_includes", {}).items()
+                        )
+                    },
+                    "dependencies": {
+                        docname: sorted(str(dep) for dep in deps)
+                        for docname, deps in sorted(dependencies.items())
+                    },
+                    "doc_suffixes": [
+                        self._get_env_docname_suffix(docname) for docname in all_docs
+                    ],
+                    "source_suffixes": list(self._get_source_suffixes()),
+                    "source_link_suffix": source_link_suffix,
+                    "sources_dir": str(sources_dir) if sources_dir else None,
+                    "llms_txt_exclude": self.config.get("llms_txt_exclude"),
+                },
+                sort_keys=True,
+                default=str,
+            )
+        )
+
+    def get_page_order(
+        self, sources_dir=None, persist: bool = True
+    ) -> List[Tuple[str, str]]:
         """Get the correct page order from the toctree structure.
 
+        The computed order is persisted between builds along with a fingerprint
+        of the toctree structure, so unchanged structure skips the traversal.
+
         Args:
             sources_dir: Optional path to _sources directory for suffix detection
+            persist: Whether to save a newly computed order; a saved order is
+                reused either way
 
         Returns:
             List of tuples (docname, source_suffix) in toctree order
@@ -114,97 +259,272 @@ class DocumentCollector:
         if not self.env or not self.master_doc:
             return []
 
-        page_order = []
-        visited = set()
+        cache_dir = get_cache_dir(self.app)
+        if not cache_dir:
+            return self._compute_page_order(sources_dir)
+
+        cache_path = cache_dir / PAGE_ORDER_FILENAME
+        fingerprint = self._get_page_order_fingerprint(sources_dir)
+        cached = load_json(cache_path)
+        if cached.get("fingerprint") == fingerprint:
+            logger.debug("sphinx-llms-txt: Reusing cached page order")
+            return [(docname, suffix) for docname, suffix in cached["page_order"]]
+
+        page_order = self._compute_page_order(sources_dir)
+        if persist:
+            save_json(
+                cache_path, {"fingerprint": fingerprint, "page_order": page_order}
+            )
+        return page_order
 
-        def collect_from_toctree(docname: str):
-            """Recursively collect documents from toctree."""
-            if docname in visited:
-                return
+    def _compute_page_order(self, sources_dir=None) -> List[Tuple[str, str]]:
+        """Walk the toctree structure to compute the page order.
 
-            visited.add(docname)
+        Args:
+            sources_dir: Optional path to _sources directory for suffix detection
 
-            # Add the current document with its suffix
-            if docname not in [doc for doc, _ in page_order]:
-                suffix = None
-                if sources_dir:
-                    suffix = self._get_docname_suffix(docname, sources_dir)
-                page_order.append((docname, suffix))
+        Returns:
+            List of tuples (docname, source_suffix) in toctree order
+        """
+
+        # Insertion-ordered set of docname -> suffix
+        page_order: Dict[str, Optional[str]] = {}
 
-            # Check for toctree entries in this document
+        # Directory index for the sibling fallback, built on first use
+        docname_trie: Optional[DocnameTrie] = None
+
+        def get_suffix(docname: str) -> Optional[str]:
+            if sources_dir:
+                return self._get_docname_suffix(docname, sources_dir)
+            return None
+
+        def get_children(docname: str) -> List[str]:
+            """Get the documents to visit after a document, in order."""
+            nonlocal docname_trie
             try:
                 # Look for toctree_includes which contains the direct children
                 if (
                     hasattr(self.env, "toctree_includes")
                     and docname in self.env.toctree_includes
                 ):
-                    for child_docname in self.env.toctree_includes[docname]:
-                        collect_from_toctree(child_docname)
+                    return list(self.env.toctree_includes[docname])
                 # Try to use dependencies to find related documents
                 elif (
                     hasattr(self.env, "dependencies")
                     and docname in self.env.dependencies
                 ):
-                    # Extract the dependent documents from the dependencies dict
-                    for child_docname in self.env.dependencies[docname]:
-                        # Only add documents actually in the document set
-                        if (
-                            hasattr(self.env, "all_docs")
-                            and child_docname in self.env.all_docs
-                        ):
-                            collect_from_toctree(child_docname)
+                    # Only add documents actually in the document set. The
+                    # dependencies are a set, so sort them for a stable order.
+                    return [
+                        child_docname
+                        for child_docname in sorted(self.env.dependencies[docname])
+                        if hasattr(self.env, "all_docs")
+                        and child_docname in self.env.all_docs
+                    ]
                 # Fallback to titles or other available references
                 elif hasattr(self.env, "titles") and hasattr(self.env, "all_docs"):
-                    # Get all document names
-                    all_docnames = list(self.env.all_docs.keys())
-
                     # Look for documents that might be related (have similar paths)
                     current_prefix = "/".join(docname.split("/")[:-1])
                     if current_prefix:
-                        for child_docname in all_docnames:
-                            # Documents in the same directory might be related
-                            if (
-                                child_docname.startswith(current_prefix)
-                                and child_docname != docname
-                            ):
-                                collect_from_toctree(child_docname)
+                        if docname_trie is None:
+                            # Sorted so the order doesn't depend on read order
+                            docname_trie = DocnameTrie(sorted(self.env.all_docs))
+                        # Documents in the same directory might be related
+                        return [
+                            child_docname
+                            for child_docname in docname_trie.docs_under(current_prefix)
+                            if child_docname != docname
+                        ]
             except Exception as e:
                 logger.debug(f"Could not get toctree for {docname}: {e}")
+            return []
 
-        # Start from the master document
-        collect_from_toctree(self.master_doc)
+        # Depth-first pre-order walk from the master document. Children are
+        # pushed in reverse so they are popped in toctree order, which visits
+        # documents in the same order as a recursive traversal would.
+        stack = [self.master_doc]
+        while stack:
+            docname = stack.pop()
+            if docname in page_order:
+                continue
+
+            page_order[docname] = get_suffix(docname)
+            stack.extend(reversed(get_children(docname)))
 
         # Add any remaining documents not in the toctree (sorted)
         if hasattr(self.env, "all_docs"):
-            processed_docnames = {doc for doc, _ in page_order}
             remaining = sorted(
-                [
-                    doc
-                    for doc in self.env.all_docs.keys()
-                    if doc not in processed_docnames
-                ]
+                doc for doc in self.env.all_docs.keys() if doc not in page_order
             )
             for docname in remaining:
-                suffix = None
-                if sources_dir:
-                    suffix = self._get_docname_suffix(docname, sources_dir)
-                page_order.append((docname, suffix))
+                page_order[docname] = get_suffix(docname)
 
-        return page_order
+        return list(page_order.items())
+
+    def _get_toctree_subtree(self, root: str) -> Set[str]:
+        """Get a document and every document below it in the toctree.
+
+        Args:
+            root: The docname at the root of the subtree
+
+        Returns:
+            Set of docnames in the subtree, including the root
+        """
+        toctree_includes = getattr(self.env, "toctree_includes", {})
+        subtree = set()
+        stack = [root]
+        while stack:
+            docname = stack.pop()
+            if docname in subtree:
+                continue
+            subtree.add(docname)
+            stack.extend(toctree_includes.get(docname, []))
+        return subtree
+
+    def get_toctree_sections(
+        self, parent: Optional[str] = None
+    ) -> List[Tuple[str, Set[str]]]:
+        """Get the toctree sections directly below a document.
+
+        Args:
+            parent: The document whose toctree defines the sections, by
+                default the root document
+
+        Returns:
+            List of (section root docname, docnames in its subtree) tuples, in
+            toctree order, leaving out excluded sections
+        """
+        parent = parent or self.master_doc
+        toctree_includes = getattr(self.env, "toctree_includes", {})
+        sections = []
+        for root in toctree_includes.get(parent, []):
+            if root in (parent, self.master_doc) or self.is_excluded(root):
+                continue
+            sections.append((root, self._get_toctree_subtree(root)))
+        return sections
+
+    def get_toctree_depths(self) -> Dict[str, int]:
+        """Get how deep each document sits in the toctree.
+
+        Returns:
+            Dictionary mapping docnames reachable from the root document to
+            their shortest toctree distance from it, 0 for the root itself
+        """
+        toctree_includes = getattr(self.env, "toctree_includes", {})
+        depths = {self.master_doc: 0}
+        level = [self.master_doc]
+        while level:
+            next_level = []
+            for docname in level:
+                for child in toctree_includes.get(docname, []):
+                    if child not in depths:
+                        depths[child] = depths[docname] + 1
+                        next_level.append(child)
+            level = next_level
+        return depths
+
+    def _get_excluded_docnames(self) -> Set[str]:
+        """Get the docnames excluded by membership rather than by pattern.
+
+        The subtrees configured in llms_txt_exclude_toctree and the pages
+        matched by metadata filters are resolved once into a set, so checking
+        a page is a single lookup.
+        """
+        if self._excluded_docnames is None:
+            excluded = set(self.metadata_excluded)
+            for root in self.config.get("llms_txt_exclude_toctree") or []:
+                excluded |= self._get_toctree_subtree(root)
+            self._excluded_docnames = excluded
+        return self._excluded_docnames
+
+    def build_metadata_index(
+        self, fields: Iterable[str]
+    ) -> Dict[str, Dict[str, Set[str]]]:
+        """Index page metadata by field and normalized value.
+
+        Args:
+            fields: The metadata fields to index
+
+        Returns:
+            Mapping of field -> lowercased value -> docnames with that value
+        """
+        fields = set(fields)
+        index: Dict[str, Dict[str, Set[str]]] = {field: {} for field in fields}
+        for docname, metadata in getattr(self.env, "metadata", {}).items():
+            for field in fields.intersection(metadata):
+                value = str(metadata[field]).strip().lower()
+                index[field].setdefault(value, set()).add(docname)
+        return index
+
+    def set_metadata_filters(self, index: Dict[str, Dict[str, Set[str]]]):
+        """Resolve llms_txt_exclude_metadata against a metadata index.
+
+        A filter value of True matches any page that has the field, a string
+        matches that value and a list matches any of its values (all compared
+        case-insensitively).
+
+        Args:
+            index: Metadata index from build_metadata_index
+        """
+        excluded = set()
+        for field, wanted in (
+            self.config.get("llms_txt_exclude_metadata") or {}
+        ).items():
+            values = index.get(field, {})
+            if wanted is True:
+                for docnames in values.values():
+                    excluded |= docnames
+                continue
+            if isinstance(wanted, str) or not isinstance(wanted, Iterable):
+                wanted = [wanted]
+            for value in wanted:
+                excluded |= values.get(str(value).strip().lower(), set())
+
+        self.metadata_excluded = excluded
+        self._excluded_docnames = None
+
+    def _get_exclude_regex(self) -> Optional[re.Pattern]:
+        """Compile the llms_txt_exclude glob patterns into a single regex."""
+        exclude_patterns = self.config.get("llms_txt_exclude")
+        if not exclude_patterns:
+            return None
+        if self._exclude_regex is None:
+            self._exclude_regex = re.compile(
+                "|".join(
+                    f"(?:{re.escape(pattern)}\\Z)|(?:{fnmatch.translate(pattern)})"
+                    for pattern in exclude_patterns
+                )
+            )
+        return self._exclude_regex
+
+    def matches_exclude_patterns(self, name: str) -> bool:
+        """Check if a name matches any of the llms_txt_exclude patterns."""
+        exclude_regex = self._get_exclude_regex()
+        return bool(exclude_regex and exclude_regex.match(name))
+
+    def is_excluded(self, docname: str) -> bool:
+        """Check if a document is excluded from the generated files.
+
+        Args:
+            docname: The document name to check
+
+        Returns:
+            True if the document matches an exclude pattern or is part of an
+            excluded toctree subtree, False otherwise
+        """
+        return docname in self._get_excluded_docnames() or (
+            self.matches_exclude_patterns(docname)
+        )
 
     def filter_excluded_pages(
         self, page_order: List[Tuple[str, str]]
     ) -> List[Tuple[str, str]]:
         """Filter out excluded pages from the page order."""
-        exclude_patterns = self.config.get("llms_txt_exclude")
-        if exclude_patterns:
+        if self.config.get("llms_txt_exclude") or self._get_excluded_docnames():
             return [
                 (docname, suffix)
                 for docname, suffix in page_order
-                if not any(
-                    self._match_exclude_pattern(docname, pattern)
-                    for pattern in exclude_patterns
-                )
+                if not self.is_excluded(docname)
             ]
         return page_order
 
@@ -2,21 +2,44 @@
 Main manager module for sphinx-llms-txt.
 """
 
+import fnmatch
 import glob
+import json
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from sphinx.application import Sphinx
 from sphinx.environment import BuildEnvironment
 from sphinx.util import logging
 
+from .cache import (
+    DESCRIPTIONS_FILENAME,
+    ROOT_PARAGRAPH_FILENAME,
+    ContentAddressedStore,
+    ProcessedPageCache,
+    get_cache_dir,
+    hash_text,
+    load_json,
+    remove_stale_outputs,
+    save_json,
+)
 from .collector import DocumentCollector
 from .processor import DocumentProcessor
-from .writer import FileWriter
+from .writer import CHARS_PER_TOKEN, AtomicOutputFile, FileWriter, measure_text
 
 logger = logging.getLogger(__name__)
 
+# Number of hex digits of the content hash shown in llms.txt links
+LINK_HASH_LENGTH = 16
+
+# Average line length used to estimate line counts from file sizes
+ESTIMATED_BYTES_PER_LINE = 40
+
+# Maximum number of section files written at the same time
+MAX_SECTION_WORKERS = 8
+
 
 def _get_git_root(path: Path) -> Optional[Path]:
     """Get the git root directory for a given path."""
@@ -130,6 +153,11 @@ class LLMSFullManager:
         self.outdir: Optional[str] = None
         self.app: Optional[Sphinx] = None
         self.ignored_pages: set = set()
+        self.resolved_pages: Set[str] = set()
+        self.page_cache: Optional[ProcessedPageCache] = None
+        self.page_stats: Dict[str, Tuple[str, int]] = {}
+        self.content_store: Optional[ContentAddressedStore] = None
+        self._portable_config_hash: str = ""
 
     def set_master_doc(self, master_doc: str):
         """Set the master document name."""
@@ -145,6 +173,83 @@ class LLMSFullManager:
         """Update the title for a page."""
         self.collector.update_page_title(docname, title)
 
+    def update_page_description(self, docname: str, description: str):
+        """Update the description for a page."""
+        self.collector.update_page_description(docname, description)
+
+    def mark_page_resolved(self, docname: str):
+        """Record that a page was resolved, and its description captured."""
+        self.resolved_pages.add(docname)
+
+    def _restore_page_descriptions(self):
+        """Merge in descriptions captured by previous builds and persist them.
+
+        Descriptions are captured in doctree-resolved, which only fires for
+        pages that are rewritten, so pages not resolved by this build keep
+        their description from the build that last wrote them. Pages resolved
+        without a description lose the one they had.
+        """
+        cache_dir = get_cache_dir(self.app)
+        if not cache_dir:
+            return
+
+        cache_path = cache_dir / DESCRIPTIONS_FILENAME
+        all_docs = getattr(self.env, "all_docs", None)
+        descriptions = self.collector.page_descriptions
+        for docname, description in load_json(cache_path).items():
+            if (
+                docname not in descriptions
+                and docname not in self.resolved_pages
+                and (all_docs is None or docname in all_docs)
+            ):
+                descriptions[docname] = description
+        save_json(cache_path, dict(sorted(descriptions.items())))
+
+    def restore_root_paragraph(self, paragraph: Optional[str]) -> str:
+        """Get the root document's first paragraph, persisting it between builds.
+
+        Like page descriptions, the paragraph is captured in doctree-resolved,
+        so when the root document isn't rewritten the paragraph from the build
+        that last wrote it is used.
+
+        Args:
+            paragraph: The paragraph captured in this build, or None if the
+                root document wasn't resolved
+
+        Returns:
+            The root document's first paragraph, or an empty string
+        """
+        cache_dir = get_cache_dir(self.app)
+        if not cache_dir:
+            return paragraph or ""
+
+        cache_path = cache_dir / ROOT_PARAGRAPH_FILENAME
+        if paragraph is not None:
+            save_json(cache_path, {"docname": self.master_doc, "paragraph": paragraph})
+            return paragraph
+
+        data = load_json(cache_path)
+        if data.get("docname") == self.master_doc:
+            return data.get("paragraph") or ""
+        return ""
+
+    def apply_metadata_filters(self):
+        """Evaluate page metadata once for the whole build.
+
+        Pages with llms-txt-ignore metadata are marked as ignored, and the
+        configured llms_txt_exclude_metadata filters are handed to the
+        collector's exclusion filter.
+        """
+        fields = set(self.config.get("llms_txt_exclude_metadata") or {})
+        fields.add("llms-txt-ignore")
+        index = self.collector.build_metadata_index(fields)
+
+        for value in ("true", "1", "yes"):
+            for docname in index["llms-txt-ignore"].get(value, ()):
+                self.mark_page_ignored(docname)
+
+        self.collector.set_metadata_filters(index)
+
     def mark_page_ignored(self, docname: str):
         """Mark a page as ignored due to llms-txt-ignore metadata."""
         self.ignored_pages.add(docname)
@@ -192,17 +297,28 @@ class LLMSFullManager:
         self.processor = DocumentProcessor(self.config, srcdir)
         self.writer = FileWriter(self.config, outdir, self.app)
 
-        # Find sources directory first so we can pass it to get_page_order
-        sources_dir = None
-        possible_sources = [
-            Path(outdir) / "_sources",
-            Path(outdir) / "html" / "_sources",
-        ]
+        # Load processed content from the previous build, invalidating pages
+        # whose include files have changed
+        self.page_cache = ProcessedPageCache(
+            get_cache_dir(self.app), self._get_processor_config_hash()
+        )
+        self.page_cache.load()
+        self.page_stats = {}
 
-        for path in possible_sources:
-            if path.exists():
-                sources_dir = path
-                break
+        # Processed pages shared between machines, e.g. restored on CI
+        self.content_store = None
+        cache_dir = self.config.get("llms_txt_cache_dir")
+        if cache_dir:
+            confdir = getattr(self.app, "confdir", None) if self.app else None
+            cache_path = Path(confdir) / cache_dir if confdir else Path(cache_dir)
+            self.content_store = ContentAddressedStore(cache_path)
+            self._portable_config_hash = self._get_portable_config_hash()
+
+        if self.config.get("llms_txt_page_descriptions"):
+            self._restore_page_descriptions()
+
+        # Find sources directory first so we can pass it to get_page_order
+        sources_dir = self._find_sources_dir(outdir)
 
         # Get the correct page order (with or without source suffixes)
         page_order = self.collector.get_page_order(sources_dir)
@@ -218,13 +334,8 @@ class LLMSFullManager:
         if not sources_dir:
             # Generate llms.txt if requested
             if self.config.get("llms_txt_file"):
-                filtered_page_order = self._filter_ignored_pages(page_order)
-                self.writer.write_verbose_info_to_file(
-                    filtered_page_order,
-                    self.collector.page_titles,
-                    0,  # No line count since no llms-full.txt
-                    sources_dir,
-                )
+                # No line count since no llms-full.txt
+                self._write_llms_txt(page_order, 0, sources_dir)
 
             # Only warn if user explicitly wants llms-full.txt
             if self.config.get("llms_txt_full_file"):
@@ -256,36 +367,20 @@ class LLMSFullManager:
         docname_to_file = {}
 
         # Get the source link suffix from Sphinx config
-        source_link_suffix = (
-            self.app.config.html_sourcelink_suffix if self.app else ".txt"
-        )
-
-        # Handle empty string case specially
-        if source_link_suffix == "":
-            source_link_suffix = ""  # Keep it empty
-        elif not source_link_suffix.startswith("."):
-            source_link_suffix = "." + source_link_suffix
+        source_link_suffix = self._get_source_link_suffix()
 
         # Process each (docname, suffix) in the page order
         for docname, src_suffix in page_order:
             # Skip excluded pages
-            if exclude_patterns and any(
-                self.collector._match_exclude_pattern(docname, pattern)
-                for pattern in exclude_patterns
-            ):
+            if self.collector.is_excluded(docname):
                 continue
 
             # Build the source file path directly using the known suffix
             if src_suffix:
-                # Avoid duplicate extensions when source_suffix == source_link_suffix
-                if src_suffix == source_link_suffix:
-                    source_file = sources_dir / f"{docname}{src_suffix}"
-                    expected_suffix = src_suffix
-                else:
-                    source_file = (
-                        sources_dir / f"{docname}{src_suffix}{source_link_suffix}"
-                    )
-                    expected_suffix = f"{src_suffix}{source_link_suffix}"
+                expected_suffix = self._get_source_file_suffix(
+                    src_suffix, source_link_suffix
+                )
+                source_file = sources_dir / f"{docname}{expected_suffix}"
 
                 if source_file.exists():
                     docname_to_file[docname] = source_file
@@ -299,8 +394,9 @@ class LLMSFullManager:
                     f"sphinx-llms-txt: No source suffix determined for: {docname}"
                 )
 
-        # Generate content
+        # Generate content, tracking the document each part came from
         content_parts = []
+        part_docnames = []
 
         # Track code files for later processing
         code_file_parts = []
@@ -320,9 +416,15 @@ class LLMSFullManager:
             size_policy = self.config.get("llms_txt_full_size_policy", "warn_skip")
             _, size_policy_action = self._parse_size_policy_config(size_policy)
 
-        # Only collect all files if action is "keep"
+        # Only collect all files if action is "keep" or "pack"
         # For "skip" and "note", we can abort early when size limit is exceeded
         should_abort_early = size_policy_action in ["skip", "note"]
+        # Tiers and section files are written from every page, so they need
+        # the full collection
+        if self.config.get("llms_txt_full_tiers") or self.config.get(
+            "llms_txt_full_sections"
+        ):
+            should_abort_early = False
 
         for docname, _ in page_order:
             # Skip pages marked as ignored
@@ -348,26 +450,21 @@ class LLMSFullManager:
                     break
 
                 # Double-check this file should be included (not in excluded patterns)
-                exclude_patterns = self.config.get("llms_txt_exclude")
                 file_stem = file_path.stem
                 should_include = True
 
-                if exclude_patterns:
-                    # Check stem and docname against exclusion patterns
-                    if any(
-                        self.collector._match_exclude_pattern(file_stem, pattern)
-                        for pattern in exclude_patterns
-                    ) or any(
-                        self.collector._match_exclude_pattern(docname, pattern)
-                        for pattern in exclude_patterns
-                    ):
-                        logger.debug(
-                            f"sphinx-llms-txt: Final exclusion check removed: {docname}"
-                        )
-                        should_include = False
+                # Check stem and docname against exclusion patterns
+                if self.collector.matches_exclude_patterns(
+                    file_stem
+                ) or self.collector.is_excluded(docname):
+                    logger.debug(
+                        f"sphinx-llms-txt: Final exclusion check removed: {docname}"
+                    )
+                    should_include = False
 
                 if content and should_include:
                     content_parts.append(content)
+                    part_docnames.append(docname)
                     added_files.add(file_path.stem)
                     total_line_count += line_count
             else:
@@ -384,12 +481,10 @@ class LLMSFullManager:
             source_suffixes = self._get_source_suffixes()
             all_source_files = []
             for src_suffix in source_suffixes:
-                # Avoid duplicate extensions when source_suffix == source_link_suffix
-                if src_suffix == source_link_suffix:
-                    glob_pattern = f"**/*{src_suffix}"
-                else:
-                    glob_pattern = f"**/*{src_suffix}{source_link_suffix}"
-                all_source_files.extend(sources_dir.glob(glob_pattern))
+                combined_suffix = self._get_source_file_suffix(
+                    src_suffix, source_link_suffix
+                )
+                all_source_files.extend(sources_dir.glob(f"**/*{combined_suffix}"))
 
             processed_paths = set(file.resolve() for file in docname_to_file.values())
 
@@ -414,12 +509,9 @@ class LLMSFullManager:
 
                 # Try each source suffix to find which one this file uses
                 for src_suffix in source_suffixes:
-                    # Avoid duplicate extensions when suffixes match
-                    if src_suffix == source_link_suffix:
-                        combined_suffix = src_suffix
-                    else:
-                        combined_suffix = f"{src_suffix}{source_link_suffix}"
-
+                    combined_suffix = self._get_source_file_suffix(
+                        src_suffix, source_link_suffix
+                    )
                     if rel_path.endswith(combined_suffix):
                         docname = rel_path[: -len(combined_suffix)]  # Remove suffix
                         break
@@ -435,10 +527,7 @@ class LLMSFullManager:
                     continue
 
                 # Skip excluded docnames
-                if exclude_patterns and any(
-                    self.collector._match_exclude_pattern(docname, pattern)
-                    for pattern in exclude_patterns
-                ):
+                if self.collector.is_excluded(docname):
                     logger.debug(f"sphinx-llms-txt: Skipping excluded file: {docname}")
                     continue
 
@@ -457,6 +546,7 @@ class LLMSFullManager:
                 if content:
                     logger.debug(f"sphinx-llms-txt: Adding remaining file: {docname}")
                     content_parts.append(content)
+                    part_docnames.append(docname)
                     total_line_count += line_count
 
         # Process code files at the end if configured
@@ -488,6 +578,7 @@ class LLMSFullManager:
                     )
                     content_parts.append(section_header)
                     content_parts.extend(code_file_parts)
+                    part_docnames.extend([None] * (len(code_file_parts) + 1))
                     # Add line count for the section header too
                     total_line_count += (
                         code_files_line_count + section_header.count("\n") + 1
@@ -496,6 +587,26 @@ class LLMSFullManager:
             # If we aborted early for skip/note actions, set empty code file parts
             code_file_parts = []
 
+        # Hash the processed pages for cache validation by mirrors
+        if self.config.get("llms_txt_link_hashes"):
+            for part, docname in zip(content_parts, part_docnames):
+                if docname is not None:
+                    self.page_stats[docname] = self._get_page_stats(part)
+
+        # Persist processed pages, dropping documents that no longer exist
+        self.page_cache.save(
+            self.env.all_docs.keys() if hasattr(self.env, "all_docs") else None
+        )
+
+        # Write the budget-limited tiers, whatever happens to llms-full.txt
+        if content_parts and self.config.get("llms_txt_full_tiers"):
+            self._write_tier_files(content_parts, part_docnames, output_path)
+
+        # Likewise the per-section files, which llms.txt links in every case
+        section_files = self._write_section_files(
+            content_parts, part_docnames, output_path
+        )
+
         # Handle size limit exceeded cases
         if max_lines is not None and (
             total_line_count > max_lines or aborted_due_to_size
@@ -519,12 +630,8 @@ class LLMSFullManager:
                 logger.info(f"sphinx-llms-txt: Skipping {filename} generation")
                 # Log summary information if requested
                 if self.config.get("llms_txt_file"):
-                    filtered_page_order = self._filter_ignored_pages(page_order)
-                    self.writer.write_verbose_info_to_file(
-                        filtered_page_order,
-                        self.collector.page_titles,
-                        total_line_count,
-                        sources_dir,
+                    self._write_llms_txt(
+                        page_order, total_line_count, sources_dir, section_files
                     )
                 return
             elif action == "note":
@@ -533,35 +640,551 @@ class LLMSFullManager:
 
                 # Log summary information if requested
                 if self.config.get("llms_txt_file"):
-                    filtered_page_order = self._filter_ignored_pages(page_order)
-                    self.writer.write_verbose_info_to_file(
-                        filtered_page_order,
-                        self.collector.page_titles,
-                        total_line_count,
-                        sources_dir,
+                    self._write_llms_txt(
+                        page_order, total_line_count, sources_dir, section_files
                     )
                 return
             elif action == "keep":
                 filename = self.config.get("llms_txt_full_filename", "llms-full.txt")
                 # Fall through to write the file
+            elif action == "pack":
+                content_parts, part_docnames, total_line_count = self._pack_to_size(
+                    content_parts, part_docnames, max_lines
+                )
+                # Fall through to write the packed file
 
         # Write combined file only if we have content to write
         if content_parts:
             success = self.writer.write_combined_file(
-                content_parts, output_path, total_line_count
+                content_parts, output_path, total_line_count, part_docnames
             )
         else:
             success = False
 
         # Log summary information if requested
         if success and self.config.get("llms_txt_file"):
-            filtered_page_order = self._filter_ignored_pages(page_order)
+            self._write_llms_txt(
+                page_order, total_line_count, sources_dir, section_files
+            )
+
+    def _write_llms_txt(
+        self,
+        page_order: List[Tuple[str, str]],
+        total_line_count: int,
+        sources_dir: Optional[Path],
+        section_files: Optional[List[Tuple[str, str]]] = None,
+    ):
+        """Write llms.txt, flat or as nested indexes following the toctree."""
+        filtered_page_order = self._filter_ignored_pages(page_order)
+        depth = self.config.get("llms_txt_index_depth")
+        if depth is not None:
+            try:
+                depth = int(depth)
+            except (TypeError, ValueError):
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid llms_txt_index_depth: {depth!r}. "
+                    f"Expected an integer, writing a flat index."
+                )
+                depth = 0
+        if depth:
+            self.writer.write_nested_index(
+                self._build_index_tree(filtered_page_order, depth),
+                self.collector.page_titles,
+                sources_dir,
+                self.collector.page_descriptions,
+                self.page_stats,
+                section_files,
+            )
+        else:
             self.writer.write_verbose_info_to_file(
                 filtered_page_order,
                 self.collector.page_titles,
                 total_line_count,
                 sources_dir,
+                self.collector.page_descriptions,
+                self.page_stats,
+                section_files,
+            )
+            # Remove the nested indexes of a previous build
+            remove_stale_outputs(
+                get_cache_dir(self.app), Path(self.outdir), "indexes", []
+            )
+
+    def _build_index_tree(
+        self, page_order: List[Tuple[str, str]], depth: int
+    ) -> Dict[str, Any]:
+        """Group the page order into nested llms.txt indexes along the toctree.
+
+        Each document in a toctree starts a section holding the pages of its
+        subtree, down to the given depth. Pages that aren't in any section,
+        like the root document itself, are listed directly.
+
+        Args:
+            page_order: Ordered list of (docname, suffix) tuples
+            depth: Number of levels of nested indexes
+
+        Returns:
+            Node dict with the ``docname`` and file ``name`` of the section,
+            its own ``pages`` and its child ``sections``
+        """
+        # The root index keeps the "index" name for its continuation files
+        used_names = {"index"}
+
+        def build(docname, name, pages, remaining_depth):
+            node = {"docname": docname, "name": name, "pages": [], "sections": []}
+            if remaining_depth <= 0:
+                node["pages"] = pages
+                return node
+
+            assigned = set()
+            for root, subtree in self.collector.get_toctree_sections(docname):
+                section_pages = [
+                    page
+                    for page in pages
+                    if page[0] in subtree and page[0] not in assigned
+                ]
+                if not section_pages:
+                    continue
+                assigned.update(page[0] for page in section_pages)
+                node["sections"].append(
+                    build(
+                        root,
+                        self._get_section_filename(root, used_names),
+                        section_pages,
+                        remaining_depth - 1,
+                    )
+                )
+            node["pages"] = [page for page in pages if page[0] not in assigned]
+            return node
+
+        return build(self.master_doc, "index", list(page_order), depth)
+
+    def _get_section_filename(self, root: str, used_names: Set[str]) -> str:
+        """Get a unique file name (without suffix) for a toctree section.
+
+        ``api/index`` becomes ``api`` and ``guides/setup`` becomes
+        ``guides-setup``.
+        """
+        if root.endswith("/index"):
+            root = root[: -len("/index")]
+        base_name = root.replace("/", "-")
+        name = base_name
+        number = 2
+        while name in used_names:
+            name = f"{base_name}-{number}"
+            number += 1
+        used_names.add(name)
+        return name
+
+    def _write_section_files(
+        self,
+        content_parts: List[str],
+        part_docnames: List[Optional[str]],
+        output_path: Path,
+    ) -> List[Tuple[str, str]]:
+        """Write one llms-full file per top-level toctree section.
+
+        Sections are written from the already processed pages to a directory
+        named after the combined file, e.g. ``llms-full/api.txt``; only the
+        file writes run concurrently. Section files of the previous build that
+        aren't written again, e.g. because llms_txt_full_sections is now off,
+        are removed.
+
+        Returns:
+            List of (section title, path relative to outdir) of the files written
+        """
+        section_dir = output_path.parent / output_path.stem
+        jobs = []
+        if self.config.get("llms_txt_full_sections"):
+            sections = self.collector.get_toctree_sections()
+            section_indexes = {}
+            for index, (_, docnames) in enumerate(sections):
+                for docname in docnames:
+                    section_indexes.setdefault(docname, []).append(index)
+            section_parts = [[] for _ in sections]
+            for part, docname in zip(content_parts, part_docnames):
+                for index in section_indexes.get(docname, ()):
+                    section_parts[index].append(part)
+
+            used_names = set()
+            for (root, _), parts in zip(sections, section_parts):
+                if parts:
+                    name = self._get_section_filename(root, used_names)
+                    path = section_dir / f"{name}{output_path.suffix}"
+                    jobs.append((root, path, parts))
+
+        results = []
+        if jobs:
+            section_dir.mkdir(exist_ok=True)
+            with ThreadPoolExecutor(
+                max_workers=min(len(jobs), MAX_SECTION_WORKERS)
+            ) as executor:
+                results = list(
+                    executor.map(
+                        lambda job: self.writer.write_section_file(job[2], job[1]),
+                        jobs,
+                    )
+                )
+
+        # Remove the files of sections that no longer exist
+        written = [path for (_, path, _), success in zip(jobs, results) if success]
+        remove_stale_outputs(
+            get_cache_dir(self.app), Path(self.outdir), "sections", written
+        )
+        if not jobs:
+            return []
+
+        section_files = [
+            (
+                self.collector.page_titles.get(root, root),
+                path.relative_to(Path(self.outdir)).as_posix(),
+            )
+            for (root, path, _), success in zip(jobs, results)
+            if success
+        ]
+        logger.info(
+            f"sphinx-llms-txt: Created {len(section_files)} section files in "
+            f"{section_dir}"
+        )
+        return section_files
+
+    def _get_tiers(self, output_path: Path) -> List[Tuple[Path, Optional[int]]]:
+        """Get the valid (path, token budget) pairs of llms_txt_full_tiers."""
+        tiers = self.config.get("llms_txt_full_tiers") or {}
+        if not isinstance(tiers, dict):
+            logger.warning(
+                f"sphinx-llms-txt: Invalid llms_txt_full_tiers: {tiers!r}. "
+                f"Expected a dictionary of file names to token budgets."
             )
+            return []
+
+        valid_tiers = []
+        for filename, budget in tiers.items():
+            path = output_path.parent / filename
+            if path == output_path:
+                logger.warning(
+                    f"sphinx-llms-txt: Tier {filename} would overwrite "
+                    f"{output_path.name}. Skipping."
+                )
+                continue
+            if budget is not None and (
+                not isinstance(budget, int) or isinstance(budget, bool) or budget < 0
+            ):
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid token budget for tier {filename}: "
+                    f"{budget!r}. Expected a non-negative integer or None. Skipping."
+                )
+                continue
+            valid_tiers.append((path, budget))
+        return valid_tiers
+
+    def _get_priority_patterns(self) -> List[Tuple[str, float]]:
+        """Get the valid (pattern, weight) pairs of llms_txt_full_priorities."""
+        priorities = self.config.get("llms_txt_full_priorities") or {}
+        if not isinstance(priorities, dict):
+            logger.warning(
+                f"sphinx-llms-txt: Invalid llms_txt_full_priorities: "
+                f"{priorities!r}. Expected a dict of patterns to weights."
+            )
+            return []
+        patterns = []
+        for pattern, weight in priorities.items():
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool):
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid llms_txt_full_priorities weight for "
+                    f"{pattern}: {weight!r}. Expected a number. Ignoring it."
+                )
+                continue
+            patterns.append((pattern, weight))
+        return patterns
+
+    def _get_page_priorities(
+        self, docnames: Iterable[str]
+    ) -> Dict[str, Tuple[float, float]]:
+        """Rank pages for budget-limited output, lower values first.
+
+        Pages with a higher llms_txt_full_priorities weight come first, then
+        pages nearer the top of the toctree.
+
+        Returns:
+            Dictionary mapping each docname to its sort key; pages that aren't
+            in the toctree come after those of the same weight that are
+        """
+        depths = self.collector.get_toctree_depths()
+        patterns = self._get_priority_patterns()
+        priorities = {}
+        for docname in docnames:
+            # The first pattern matching the docname wins, 0 by default
+            weight = next(
+                (w for pattern, w in patterns if fnmatch.fnmatch(docname, pattern)),
+                0,
+            )
+            priorities[docname] = (-weight, depths.get(docname, float("inf")))
+        return priorities
+
+    def _pack_parts(
+        self,
+        part_sizes: List[int],
+        part_docnames: List[Optional[str]],
+        budgets: List[Optional[int]],
+    ) -> List[Tuple[List[int], int]]:
+        """Select the highest priority content parts that fit several budgets.
+
+        The parts are visited once, in priority order, and each is added to
+        every budget it still fits in, so a large page that doesn't fit lets
+        smaller pages of lower priority in. Parts that don't belong to a
+        document, like the code files, are kept together and come last.
+
+        Args:
+            part_sizes: The precomputed size of each content part, in the
+                unit of the budgets
+            part_docnames: The document each part came from, or None
+            budgets: Maximum sizes, None meaning no limit
+
+        Returns:
+            For each budget, the selected part indices in their original order
+            and the total size of the selection
+        """
+        priorities = self._get_page_priorities(
+            docname for docname in part_docnames if docname is not None
+        )
+        units = []
+        other_parts = []
+        for index, docname in enumerate(part_docnames):
+            if docname is None:
+                other_parts.append(index)
+            else:
+                units.append((priorities[docname], index, [index]))
+        if other_parts:
+            units.append(((float("inf"), float("inf")), other_parts[0], other_parts))
+        units.sort(key=lambda unit: unit[:2])
+
+        selections = [([], 0) for _ in budgets]
+        for _, _, indices in units:
+            size = sum(part_sizes[index] for index in indices)
+            for number, budget in enumerate(budgets):
+                selected, used = selections[number]
+                if budget is None or used + size <= budget:
+                    selected.extend(indices)
+                    selections[number] = (selected, used + size)
+        return [(sorted(selected), used) for selected, used in selections]
+
+    def _pack_to_size(
+        self,
+        content_parts: List[str],
+        part_docnames: List[Optional[str]],
+        max_lines: int,
+    ) -> Tuple[List[str], List[Optional[str]], int]:
+        """Keep the highest priority content parts that fit in max_lines.
+
+        Returns:
+            The kept content parts and their docnames, in their original
+            order, and their total line count
+        """
+        ((selected, total_line_count),) = self._pack_parts(
+            [part.count("\n") + 1 for part in content_parts], part_docnames, [max_lines]
+        )
+        kept = set(selected)
+        dropped = [
+            docname
+            for index, docname in enumerate(part_docnames)
+            if index not in kept and docname is not None
+        ]
+        # Pages left out of llms-full.txt don't get a content hash
+        for docname in dropped:
+            self.page_stats.pop(docname, None)
+
+        # The code files are packed as a single unit, reported as such
+        left_out = list(dropped)
+        if any(
+            index not in kept and docname is None
+            for index, docname in enumerate(part_docnames)
+        ):
+            left_out.append("code files")
+
+        filename = self.config.get("llms_txt_full_filename", "llms-full.txt")
+        logger.info(
+            f"sphinx-llms-txt: Packed {len(selected)} of {len(content_parts)} "
+            f"sources into {total_line_count} lines of {filename}, leaving out: "
+            f"{', '.join(left_out) or 'nothing'}"
+        )
+        return (
+            [content_parts[index] for index in selected],
+            [part_docnames[index] for index in selected],
+            total_line_count,
+        )
+
+    def _write_tier_files(
+        self,
+        content_parts: List[str],
+        part_docnames: List[Optional[str]],
+        output_path: Path,
+    ):
+        """Write the llms-full.txt tiers configured in llms_txt_full_tiers.
+
+        All tiers are filled together from the already processed pages, in
+        toctree priority order, and each keeps the order of llms-full.txt.
+        """
+        tiers = self._get_tiers(output_path)
+        if not tiers:
+            return
+
+        # Every part but the first is preceded by a newline separator
+        selections = self._pack_parts(
+            [measure_text("\n" + part, "tokens") for part in content_parts],
+            part_docnames,
+            [budget for _, budget in tiers],
+        )
+        for (path, budget), (selected, tokens) in zip(tiers, selections):
+            parts = [content_parts[index] for index in selected]
+            if self.writer.write_section_file(parts, path):
+                logger.info(
+                    f"sphinx-llms-txt: Created {path} with {len(parts)} of "
+                    f"{len(content_parts)} sources (about {tokens} tokens)"
+                )
+
+    def _find_sources_dir(self, outdir: str) -> Optional[Path]:
+        """Find the _sources directory of the HTML build, if there is one."""
+        for path in (Path(outdir) / "_sources", Path(outdir) / "html" / "_sources"):
+            if path.exists():
+                return path
+        return None
+
+    def _get_source_link_suffix(self) -> str:
+        """Get html_sourcelink_suffix, with a leading dot unless it's empty."""
+        source_link_suffix = (
+            self.app.config.html_sourcelink_suffix if self.app else ".txt"
+        )
+        if source_link_suffix and not source_link_suffix.startswith("."):
+            source_link_suffix = "." + source_link_suffix
+        return source_link_suffix
+
+    def _get_source_file_suffix(self, src_suffix: str, source_link_suffix: str) -> str:
+        """Get the suffix of a copied source file in the _sources directory."""
+        # Avoid duplicate extensions when source_suffix == source_link_suffix
+        if src_suffix == source_link_suffix:
+            return src_suffix
+        return f"{src_suffix}{source_link_suffix}"
+
+    def plan_sources(self, outdir: str) -> Dict[str, Any]:
+        """Report what llms-full.txt would contain, without writing anything.
+
+        The page order, exclusions, ignored pages and size policy are applied
+        as in combine_sources, but page sizes are estimated from the size of
+        each file in _sources, so nothing is read or processed. Include
+        directives and source code files are not accounted for.
+
+        Args:
+            outdir: The HTML output directory
+
+        Returns:
+            JSON-serializable report with the estimated size of each page,
+            the excluded, ignored and missing pages, totals and the projected
+            size policy outcome
+        """
+        self.outdir = outdir
+        sources_dir = self._find_sources_dir(outdir)
+        # Read-only: a cached page order is used but never saved
+        page_order = self.collector.get_page_order(sources_dir, persist=False)
+        included = self.collector.filter_excluded_pages(page_order)
+        included_docnames = {docname for docname, _ in included}
+        source_link_suffix = self._get_source_link_suffix()
+
+        max_lines = self.config.get("llms_txt_full_max_size")
+        log_level = action = None
+        if max_lines is not None:
+            log_level, action = self._parse_size_policy_config(
+                self.config.get("llms_txt_full_size_policy", "warn_skip")
+            )
+
+        pages = []
+        ignored = []
+        missing = []
+        totals = {"bytes": 0, "lines": 0, "tokens": 0}
+        first_overflow = None
+        for docname, src_suffix in included:
+            if docname in self.ignored_pages:
+                ignored.append(docname)
+                continue
+            if not sources_dir or not src_suffix:
+                missing.append(docname)
+                continue
+
+            source_file = sources_dir / (
+                docname + self._get_source_file_suffix(src_suffix, source_link_suffix)
+            )
+            try:
+                size = source_file.stat().st_size
+            except OSError:
+                missing.append(docname)
+                continue
+
+            # Each page is followed by an empty line in llms-full.txt
+            lines = -(-size // ESTIMATED_BYTES_PER_LINE) + 1
+            tokens = -(-size // CHARS_PER_TOKEN)
+            if (
+                max_lines is not None
+                and first_overflow is None
+                and totals["lines"] + lines > max_lines
+            ):
+                first_overflow = docname
+
+            totals["bytes"] += size
+            totals["lines"] += lines
+            totals["tokens"] += tokens
+            pages.append(
+                {
+                    "docname": docname,
+                    "source": source_file.relative_to(sources_dir).as_posix(),
+                    "bytes": size,
+                    "lines": lines,
+                    "tokens": tokens,
+                    "within_limit": first_overflow is None,
+                }
+            )
+
+        exceeded = first_overflow is not None
+        outcome = "write"
+        dropped = []
+        if exceeded and action == "skip":
+            outcome = "skip"
+        elif exceeded and action == "note":
+            outcome = "placeholder"
+        elif exceeded and action == "pack":
+            outcome = "pack"
+            ((selected, _),) = self._pack_parts(
+                [page["lines"] for page in pages],
+                [page["docname"] for page in pages],
+                [max_lines],
+            )
+            kept = set(selected)
+            for index, page in enumerate(pages):
+                page["within_limit"] = index in kept
+                if index not in kept:
+                    dropped.append(page["docname"])
+
+        return {
+            "output": self.config.get("llms_txt_full_filename", "llms-full.txt"),
+            "sources_dir": str(sources_dir) if sources_dir else None,
+            "estimates": {
+                "bytes_per_line": ESTIMATED_BYTES_PER_LINE,
+                "chars_per_token": CHARS_PER_TOKEN,
+            },
+            "pages": pages,
+            "excluded": [d for d, _ in page_order if d not in included_docnames],
+            "ignored": ignored,
+            "missing": missing,
+            "totals": totals,
+            "size_policy": {
+                "max_lines": max_lines,
+                "log_level": log_level,
+                "action": action,
+                "exceeded": exceeded,
+                "first_overflow": first_overflow,
+                "outcome": outcome,
+                "dropped": dropped,
+            },
+        }
 
     def _read_source_file(self, file_path: Path, docname: str) -> Tuple[str, int]:
         """Read and format a single source file.
@@ -574,27 +1197,46 @@ class LLMSFullManager:
                    in the file
         """
         # Check if this file should be excluded by looking at the doc name
-        exclude_patterns = self.config.get("llms_txt_exclude")
-        if exclude_patterns and any(
-            self.collector._match_exclude_pattern(docname, pattern)
-            for pattern in exclude_patterns
-        ):
+        if self.collector.is_excluded(docname):
             return "", 0
 
         try:
             # Check if the file stem (without extension) should be excluded
-            file_stem = file_path.stem
-            if exclude_patterns and any(
-                self.collector._match_exclude_pattern(file_stem, pattern)
-                for pattern in exclude_patterns
-            ):
+            if self.collector.matches_exclude_patterns(file_path.stem):
                 return "", 0
 
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
 
-            # Process include directives and directives with paths
-            content = self.processor.process_content(content, file_path)
+            # Reuse the processed content from the previous build when neither
+            # the source nor any of its include files have changed
+            source_hash = hash_text(content)
+            cached = (
+                self.page_cache.get(docname, source_hash) if self.page_cache else None
+            )
+            if cached is not None:
+                content = cached
+            else:
+                stored = None
+                if self.content_store:
+                    content_key, includes = self._get_content_key(
+                        docname, file_path, source_hash, content
+                    )
+                    stored = self.content_store.get(content_key)
+
+                if stored is not None:
+                    content = stored
+                else:
+                    # Process include directives and directives with paths
+                    content = self.processor.process_content(
+                        content, file_path, docname
+                    )
+                    includes = self.processor.get_page_includes(docname)
+                    if self.content_store:
+                        self.content_store.put(content_key, content)
+
+                if self.page_cache:
+                    self.page_cache.put(docname, source_hash, content, includes)
 
             # Count the lines in the content
             line_count = content.count("\n") + (0 if content.endswith("\n") else 1)
@@ -609,6 +1251,107 @@ class LLMSFullManager:
             logger.error(f"sphinx-llms-txt: Error reading source file {file_path}: {e}")
             return "", 0
 
+    def _get_page_stats(self, content: str) -> Tuple[str, int]:
+        """Get the short content hash and size in bytes of a processed page.
+
+        The hash covers the page exactly as written to llms-full.txt, so it
+        changes whenever the page or any file it includes changes. It is not
+        the hash of the file the llms.txt link points to, which is the page
+        before processing.
+        """
+        return hash_text(content)[:LINK_HASH_LENGTH], len(content.encode("utf-8"))
+
+    def _get_image_names(self) -> List[str]:
+        """Get the sorted names of the images copied to ``_images``."""
+        images_dir = Path(self.outdir) / "_images"
+        if not images_dir.is_dir():
+            return []
+        return sorted(path.name for path in images_dir.iterdir())
+
+    def _get_processor_config_hash(self) -> str:
+        """Hash the configuration that affects processed page content.
+
+        Path directives point at ``_images`` when the file exists there, so
+        the names of the copied images are part of the configuration.
+        """
+        from . import __version__
+
+        return hash_text(
+            json.dumps(
+                {
+                    "version": __version__,
+                    "srcdir": str(self.srcdir),
+                    "outdir": str(self.outdir),
+                    "llms_txt_directives": self.config.get("llms_txt_directives"),
+                    "html_baseurl": self.config.get("html_baseurl", ""),
+                    "images": self._get_image_names(),
+                },
+                sort_keys=True,
+                default=str,
+            )
+        )
+
+    def _get_portable_config_hash(self) -> str:
+        """Hash the configuration that affects processed content, without paths.
+
+        Path directives point at ``_images`` when the file exists there, so
+        the names of the copied images are part of the configuration.
+        """
+        from . import __version__
+
+        return hash_text(
+            json.dumps(
+                {
+                    "version": __version__,
+                    "llms_txt_directives": self.config.get("llms_txt_directives"),
+                    "html_baseurl": self.config.get("html_baseurl", ""),
+                    "images": self._get_image_names(),
+                },
+                sort_keys=True,
+                default=str,
+            )
+        )
+
+    def _get_portable_path(self, path: str) -> str:
+        """Make a path relative to the source or output directory if possible."""
+        for prefix, root in (("srcdir", self.srcdir), ("outdir", self.outdir)):
+            try:
+                relative = Path(path).relative_to(Path(root).resolve())
+                return f"{prefix}:{relative.as_posix()}"
+            except ValueError:
+                continue
+        return path
+
+    def _get_content_key(
+        self, docname: str, file_path: Path, source_hash: str, content: str
+    ) -> Tuple[str, Dict[str, Optional[str]]]:
+        """Build the content-addressed store key of a page.
+
+        The key covers the source content, the content of every include file
+        it pulls in and the processor configuration, using paths relative to
+        the source and output directories so it is the same on every machine.
+
+        Returns:
+            Tuple of (key, include files with their content hashes)
+        """
+        includes = self.processor.scan_includes(content, file_path)
+        include_closure = sorted(
+            (self._get_portable_path(path), include_hash)
+            for path, include_hash in includes.items()
+        )
+        key = hash_text(
+            json.dumps(
+                [
+                    self._portable_config_hash,
+                    docname,
+                    file_path.name,
+                    source_hash,
+                    include_closure,
+                ]
+            )
+        )
+        return key, includes
+
     def _get_source_suffixes(self):
         """Get all valid source file suffixes from Sphinx configuration.
 
@@ -942,7 +1685,7 @@ class LLMSFullManager:
         Returns:
             Tuple of (log_level, action) where:
             - log_level is "warn" or "info"
-            - action is "keep", "skip", or "note"
+            - action is "keep", "skip", "note", or "pack"
         """
         if not size_policy or "_" not in size_policy:
             logger.warning(
@@ -965,11 +1708,11 @@ class LLMSFullManager:
             log_level = "warn"
 
         # Validate action
-        if action not in ["keep", "skip", "note"]:
+        if action not in ["keep", "skip", "note", "pack"]:
             logger.warning(
                 f"sphinx-llms-txt: Invalid action '{action}' in "
                 f"llms_txt_full_size_policy. "
-                f"Valid options: keep, skip, note. Using 'skip'."
+                f"Valid options: keep, skip, note, pack. Using 'skip'."
             )
             action = "skip"
 
@@ -994,7 +1737,7 @@ class LLMSFullManager:
         )
 
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
+            with AtomicOutputFile(output_path) as f:
                 f.write(placeholder_content)
             logger.debug(f"sphinx-llms-txt: Wrote placeholder file: {output_path}")
         except Exception as e:
@@ -9,6 +9,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from sphinx.util import logging
 
+from .cache import hash_text
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,13 +35,18 @@ class DocumentProcessor:
     def __init__(self, config: Dict[str, Any], srcdir: Optional[str] = None):
         self.config = config
         self.srcdir = srcdir
+        # Include files seen per docname, with their content hashes
+        self.page_includes: Dict[str, Dict[str, Optional[str]]] = {}
 
-    def process_content(self, content: str, source_path: Path) -> str:
+    def process_content(
+        self, content: str, source_path: Path, docname: Optional[str] = None
+    ) -> str:
         """Process directives in content that need path resolution.
 
         Args:
             content: The source content to process
             source_path: Path to the source file (to resolve relative paths)
+            docname: Optional document name used to record include dependencies
 
         Returns:
             Processed content with directives properly resolved
@@ -48,7 +55,7 @@ class DocumentProcessor:
         content = self._process_ignore_blocks(content)
 
         # Then process include directives
-        content = self._process_includes(content, source_path)
+        content = self._process_includes(content, source_path, docname)
 
         # Then process path directives (image, figure, etc.)
         content = self._process_path_directives(content, source_path)
@@ -349,12 +356,67 @@ class DocumentProcessor:
                 return True
         return False
 
-    def _process_includes(self, content: str, source_path: Path) -> str:
+    def _record_include(
+        self, docname: Optional[str], include_file: Path, include_hash: Optional[str]
+    ):
+        """Record that a document depends on an include file.
+
+        Args:
+            docname: The including document name (nothing is recorded if None)
+            include_file: Path to the include file that was probed
+            include_hash: Hash of the include file content, or None if missing
+        """
+        if docname is None:
+            return
+        self.page_includes.setdefault(docname, {})[str(include_file)] = include_hash
+
+    def get_page_includes(self, docname: str) -> Dict[str, Optional[str]]:
+        """Return the include files recorded for a document.
+
+        Returns:
+            Mapping of include file paths to content hashes (None if missing)
+        """
+        return dict(self.page_includes.get(docname, {}))
+
+    def scan_includes(
+        self, content: str, source_path: Path
+    ) -> Dict[str, Optional[str]]:
+        """Find the include files content pulls in, without processing it.
+
+        Include files are probed the same way as when processing, so the
+        result matches what get_page_includes() records for the page (plus
+        includes inside llms-txt-ignore blocks).
+
+        Returns:
+            Mapping of include file paths to content hashes (None if missing)
+        """
+        code_block_ranges = self._get_code_block_ranges(content)
+        include_pattern = build_directive_pattern(["include"])
+
+        includes = {}
+        for match in include_pattern.finditer(content):
+            if self._is_in_code_block(match.start(), code_block_ranges):
+                continue
+            for path_to_try in self._resolve_include_paths(match.group(3), source_path):
+                try:
+                    with open(path_to_try, "r", encoding="utf-8") as f:
+                        includes[str(path_to_try)] = hash_text(f.read())
+                    break
+                except FileNotFoundError:
+                    includes[str(path_to_try)] = None
+                except (OSError, UnicodeDecodeError):
+                    continue
+        return includes
+
+    def _process_includes(
+        self, content: str, source_path: Path, docname: Optional[str] = None
+    ) -> str:
         """Process include directives in content.
 
         Args:
             content: The source content to process
             source_path: Path to the source file (to resolve relative paths)
+            docname: Optional document name used to record include dependencies
 
         Returns:
             Processed content with include directives replaced with included content
@@ -386,6 +448,10 @@ class DocumentProcessor:
                         with open(path_to_try, "r", encoding="utf-8") as f:
                             included_content = f.read()
 
+                        self._record_include(
+                            docname, path_to_try, hash_text(included_content)
+                        )
+
                         # Find where the actual directive starts, after any whitespace
                         directive_start = directive_part.find("..")
                         if directive_start > 0:
@@ -397,6 +463,10 @@ class DocumentProcessor:
                             # No leading whitespace, just return the content
                             return included_content
 
+                    # Missing candidates are dependencies too: creating one
+                    # later changes how the include resolves
+                    self._record_include(docname, path_to_try, None)
+
                 except Exception as e:
                     logger.error(
                         f"sphinx-llms-txt: Error reading include file {path_to_try}:"
@@ -0,0 +1,327 @@
+"""
+Build snapshot module for sphinx-llms-txt.
+"""
+
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Union
+
+from sphinx.util import logging
+
+from .cache import get_cache_dir, load_json
+from .manager import LLMSFullManager
+from .writer import AtomicOutputFile
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILENAME = "llms-txt-snapshot.json"
+SNAPSHOT_VERSION = 2
+
+# Doctree directories of an output directory, as laid out by ``make html``
+# and ``sphinx-build -b html``, where the snapshot is looked for by default
+DEFAULT_DOCTREE_DIRS = ("../doctrees", ".doctrees")
+
+# Sphinx configuration values read by the manager, collector and writer
+SPHINX_CONFIG_VALUES = (
+    "project",
+    "master_doc",
+    "source_suffix",
+    "html_sourcelink_suffix",
+    "html_copy_source",
+)
+
+
+def _snapshot_path(path: Any, outdir: Union[str, Path]) -> Optional[Dict[str, str]]:
+    """Record a build directory both relative to the output directory and as is.
+
+    The relative path keeps working when the whole build directory is moved
+    or restored elsewhere, e.g. from a CI artifact, and the absolute one when
+    only the output directory is copied on the same machine.
+    """
+    if not path:
+        return None
+    try:
+        relative = Path(os.path.relpath(path, outdir)).as_posix()
+    except ValueError:
+        # On another drive on Windows
+        relative = None
+    return {"relative": relative, "absolute": str(path)}
+
+
+def _resolve_path(
+    path: Optional[Dict[str, str]], outdir: Path, name: str
+) -> Optional[str]:
+    """Find a directory recorded in a snapshot on this machine.
+
+    Args:
+        path: The paths recorded by _snapshot_path
+        outdir: The output directory the snapshot was loaded from
+        name: What the directory is, for the log message
+
+    Returns:
+        The relative path resolved against the output directory if it
+        exists, otherwise the absolute path if it exists, otherwise None
+    """
+    if not path:
+        return None
+    candidates = []
+    if path.get("relative"):
+        candidates.append(os.path.normpath(outdir / path["relative"]))
+    candidates.append(path["absolute"])
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            return candidate
+    logger.info(
+        f"sphinx-llms-txt: The {name} of the build snapshot doesn't exist "
+        f"here ({' or '.join(candidates)}), continuing without it."
+    )
+    return None
+
+
+def create_snapshot(
+    manager: LLMSFullManager, outdir: Union[str, Path, None] = None
+) -> Dict[str, Any]:
+    """Capture the build state needed to regenerate the llms files.
+
+    Args:
+        manager: The manager after combine_sources has run
+        outdir: The output directory, which the source, configuration and
+            doctree directories are stored relative to (defaults to the
+            manager's output directory)
+
+    Returns:
+        A JSON-serializable snapshot
+    """
+    env = manager.env
+    app = manager.app
+    outdir = outdir or manager.outdir
+    all_docs = sorted(getattr(env, "all_docs", {}))
+
+    doc2path = {}
+    if hasattr(env, "doc2path"):
+        for docname in all_docs:
+            doc2path[docname] = Path(env.doc2path(docname, False)).as_posix()
+
+    sphinx_config = {}
+    for name in SPHINX_CONFIG_VALUES:
+        value = getattr(app.config, name, None) if app else None
+        sphinx_config[name] = list(value) if isinstance(value, dict) else value
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "srcdir": _snapshot_path(manager.srcdir, outdir),
+        "confdir": _snapshot_path(getattr(app, "confdir", None), outdir),
+        "doctreedir": _snapshot_path(getattr(app, "doctreedir", None), outdir),
+        "config": manager.config,
+        "sphinx_config": sphinx_config,
+        "all_docs": all_docs,
+        "doc2path": doc2path,
+        "toctree_includes": {
+            docname: list(children)
+            for docname, children in getattr(env, "toctree_includes", {}).items()
+        },
+        "dependencies": {
+            docname: sorted(str(dependency) for dependency in dependencies)
+            for docname, dependencies in getattr(env, "dependencies", {}).items()
+        },
+        "metadata": getattr(env, "metadata", {}),
+        "titles": manager.collector.page_titles,
+        "descriptions": manager.collector.page_descriptions,
+        "ignored_pages": sorted(manager.ignored_pages),
+    }
+
+
+def write_snapshot(
+    manager: LLMSFullManager, outdir: Union[str, Path]
+) -> Optional[Path]:
+    """Write the build snapshot to the doctree directory.
+
+    The snapshot holds local paths, the configuration and page metadata, so
+    it's kept with the doctrees rather than in the published output.
+
+    Returns:
+        The path of the snapshot file, or None without a doctree directory
+    """
+    cache_dir = get_cache_dir(manager.app)
+    if not cache_dir:
+        logger.warning(
+            "sphinx-llms-txt: No doctree directory to write the build snapshot to"
+        )
+        return None
+    snapshot_path = cache_dir / SNAPSHOT_FILENAME
+    with AtomicOutputFile(snapshot_path) as f:
+        f.write(
+            json.dumps(create_snapshot(manager, outdir), sort_keys=True, default=str)
+        )
+    logger.debug(f"sphinx-llms-txt: Wrote build snapshot: {snapshot_path}")
+    return snapshot_path
+
+
+class SnapshotEnv:
+    """Stands in for the Sphinx build environment of a snapshot."""
+
+    def __init__(self, snapshot: Dict[str, Any], srcdir: str):
+        self.srcdir = srcdir
+        self.all_docs = dict.fromkeys(snapshot["all_docs"], 0)
+        self.toctree_includes = snapshot["toctree_includes"]
+        self.dependencies = {
+            docname: set(dependencies)
+            for docname, dependencies in snapshot["dependencies"].items()
+        }
+        self.metadata = snapshot["metadata"]
+        self.titles = snapshot["titles"]
+        self._doc2path = snapshot["doc2path"]
+
+    def doc2path(self, docname: str, base: bool = True) -> str:
+        """Return the source path of a document, like BuildEnvironment.doc2path."""
+        path = self._doc2path[docname]
+        return os.path.join(self.srcdir, path) if base else path
+
+
+def find_snapshot(outdir: Union[str, Path]) -> Path:
+    """Find the build snapshot of an output directory in its doctree directory.
+
+    Raises:
+        FileNotFoundError: If no snapshot is found
+    """
+    outdir = Path(outdir)
+    candidates = [
+        Path(os.path.normpath(outdir / doctreedir / SNAPSHOT_FILENAME))
+        for doctreedir in DEFAULT_DOCTREE_DIRS
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(
+        f"No build snapshot found at {' or '.join(map(str, candidates))}. "
+        f"Build with llms_txt_snapshot = True first, or pass the snapshot path."
+    )
+
+
+def load_manager(
+    outdir: Union[str, Path],
+    config_overrides: Optional[Dict[str, Any]] = None,
+    snapshot_path: Union[str, Path, None] = None,
+) -> LLMSFullManager:
+    """Set up a manager from the build snapshot of an output directory.
+
+    Args:
+        outdir: The HTML output directory of the build
+        config_overrides: sphinx-llms-txt configuration values to change
+        snapshot_path: The snapshot file, by default looked for in the
+            doctree directory next to or inside the output directory
+
+    Returns:
+        A manager ready for combine_sources or plan_sources
+
+    Raises:
+        FileNotFoundError: If the snapshot can't be found
+        ValueError: If the snapshot is unusable or an override is unknown
+    """
+    outdir = Path(outdir)
+    if snapshot_path is None:
+        snapshot_path = find_snapshot(outdir)
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        raise FileNotFoundError(f"No build snapshot found at {snapshot_path}.")
+
+    snapshot = load_json(snapshot_path)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            f"Unsupported build snapshot {snapshot_path}, rebuild the documentation"
+        )
+
+    config = dict(snapshot["config"])
+    for name, value in (config_overrides or {}).items():
+        if name not in config:
+            raise ValueError(f"Unknown configuration value: {name}")
+        config[name] = value
+
+    # Directories that don't exist here, e.g. on a restored artifact, are
+    # left out, so the caches kept with the doctrees are skipped rather than
+    # recreated at the original location
+    srcdir = _resolve_path(snapshot["srcdir"], outdir, "source directory")
+    if srcdir is None:
+        # Nothing is written there, so pages are still processed from
+        # _sources, only without their include files
+        srcdir = snapshot["srcdir"]["absolute"]
+    sphinx_config = snapshot["sphinx_config"]
+    app = SimpleNamespace(
+        config=SimpleNamespace(**sphinx_config),
+        srcdir=srcdir,
+        outdir=str(outdir),
+        confdir=_resolve_path(snapshot["confdir"], outdir, "configuration directory"),
+        doctreedir=_resolve_path(snapshot["doctreedir"], outdir, "doctree directory"),
+    )
+
+    manager = LLMSFullManager()
+    manager.set_env(SnapshotEnv(snapshot, srcdir))
+    manager.set_master_doc(sphinx_config["master_doc"])
+    manager.set_app(app)
+    manager.set_config(config)
+    manager.srcdir = srcdir
+
+    for docname in snapshot["ignored_pages"]:
+        manager.mark_page_ignored(docname)
+    manager.apply_metadata_filters()
+
+    for docname, title in snapshot["titles"].items():
+        manager.update_page_title(docname, title)
+    for docname, description in snapshot["descriptions"].items():
+        manager.update_page_description(docname, description)
+
+    return manager
+
+
+def regenerate(
+    outdir: Union[str, Path],
+    config_overrides: Optional[Dict[str, Any]] = None,
+    snapshot_path: Union[str, Path, None] = None,
+) -> LLMSFullManager:
+    """Regenerate llms.txt and llms-full.txt from an existing HTML build.
+
+    The build must have been made with ``llms_txt_snapshot = True``. Only the
+    llms files are rewritten, from the ``_sources`` already in the output
+    directory, so changing e.g. exclusions or the size policy doesn't need a
+    full Sphinx build.
+
+    Args:
+        outdir: The HTML output directory of the build
+        config_overrides: sphinx-llms-txt configuration values to change
+        snapshot_path: The snapshot file, found next to the doctrees by default
+
+    Returns:
+        The manager used to write the files
+
+    Raises:
+        FileNotFoundError: If the snapshot can't be found
+        ValueError: If the snapshot is unusable or an override is unknown
+    """
+    manager = load_manager(outdir, config_overrides, snapshot_path)
+    manager.combine_sources(str(outdir), manager.srcdir)
+    return manager
+
+
+def plan(
+    outdir: Union[str, Path],
+    config_overrides: Optional[Dict[str, Any]] = None,
+    snapshot_path: Union[str, Path, None] = None,
+) -> Dict[str, Any]:
+    """Report what llms-full.txt would contain, without writing anything.
+
+    See LLMSFullManager.plan_sources for the report format.
+
+    Args:
+        outdir: The HTML output directory of a build made with
+            ``llms_txt_snapshot = True``
+        config_overrides: sphinx-llms-txt configuration values to change
+        snapshot_path: The snapshot file, found next to the doctrees by default
+
+    Raises:
+        FileNotFoundError: If the snapshot can't be found
+        ValueError: If the snapshot is unusable or an override is unknown
+    """
+    manager = load_manager(outdir, config_overrides, snapshot_path)
+    return manager.plan_sources(str(outdir))
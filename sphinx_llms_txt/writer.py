@@ -2,14 +2,415 @@
 File writer module for sphinx-llms-txt.
 """
 
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zlib
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from string import Formatter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from sphinx.application import Sphinx
 from sphinx.util import logging
 
+from .cache import get_cache_dir, hash_text, load_json, remove_stale_outputs
+
 logger = logging.getLogger(__name__)
 
+# Number of llms.txt links rendered per batch
+RENDER_BATCH_SIZE = 1024
+
+# File suffixes for the supported precompression formats
+COMPRESSION_SUFFIXES = {"gz": ".gz", "br": ".br", "zst": ".zst"}
+
+# Valid (lowest, highest) compression levels of each precompression format
+COMPRESSION_LEVELS = {"gz": (-1, 9), "br": (0, 11), "zst": (-(1 << 17), 22)}
+
+# Units llms-full.txt shards can be capped by
+SHARD_UNITS = ("bytes", "lines", "tokens")
+
+# How llms-full.txt shard boundaries are chosen
+SHARD_BOUNDARIES = ("size", "content")
+
+# Number of leading characters of a page hashed to pick content-defined
+# shard boundaries
+BOUNDARY_WINDOW = 256
+
+# Rough number of characters per token used for token estimates
+CHARS_PER_TOKEN = 4
+
+# Key of the parts that don't belong to a document, i.e. the code files
+# section, in the delta of llms-full.txt
+CODE_FILES_KEY = ":code-files"
+
+
+# A reStructuredText section adornment line, e.g. "=====" or "-----"
+_ADORNMENT_RE = re.compile(r"([!-/:-@\[-`{-~])\1{2,}[ \t]*")
+
+# A Markdown ATX heading, e.g. "## Title"
+_MARKDOWN_HEADING_RE = re.compile(r"(#{1,6})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*")
+
+
+def find_section_headings(content: str) -> List[Tuple[str, int, int]]:
+    """Find the section headings in reStructuredText or Markdown content.
+
+    reStructuredText heading levels follow the order in which adornment
+    styles first appear, as in docutils. Underlines shorter than the title
+    are accepted when docutils would, from 4 characters.
+
+    Returns:
+        List of (title, level, byte offset of the heading) tuples
+    """
+    lines = content.splitlines(keepends=True)
+    offsets = []
+    position = 0
+    for line in lines:
+        offsets.append(position)
+        position += len(line.encode("utf-8"))
+    lines = [line.rstrip("\r\n") for line in lines]
+
+    headings = []
+    styles = []
+    in_fence = False
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = _MARKDOWN_HEADING_RE.fullmatch(line)
+            if match:
+                headings.append((match.group(2), len(match.group(1)), offsets[index]))
+                index += 1
+                continue
+
+            under = lines[index + 1] if index + 1 < len(lines) else ""
+            over = lines[index - 1] if index > 0 else ""
+            title = line.strip()
+            if (
+                title
+                and _ADORNMENT_RE.fullmatch(under)
+                and not _ADORNMENT_RE.fullmatch(line)
+                # Like docutils, accept short underlines of 4 or more characters
+                and len(under.rstrip()) >= min(len(title), 4)
+            ):
+                has_overline = over.rstrip() == under.rstrip()
+                preceded_by_blank = index == 0 or not over.strip()
+                if has_overline or (preceded_by_blank and not line[0].isspace()):
+                    style = (under[0], has_overline)
+                    if style not in styles:
+                        styles.append(style)
+                    start = offsets[index - 1] if has_overline else offsets[index]
+                    headings.append((title, styles.index(style) + 1, start))
+                    index += 2
+                    continue
+        index += 1
+    return headings
+
+
+def measure_text(text: str, unit: str) -> int:
+    """Measure text in one of SHARD_UNITS.
+
+    Tokens are estimated from the character count, which is close enough for
+    budgeting without depending on a particular tokenizer.
+    """
+    if unit == "lines":
+        return text.count("\n")
+    if unit == "tokens":
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(text.encode("utf-8"))
+
+
+# The process umask, read once by _get_umask
+_umask: Optional[int] = None
+_umask_lock = threading.Lock()
+
+
+def _get_umask() -> int:
+    """Get the process umask without changing it.
+
+    Reading the umask means briefly setting it, which other threads could
+    observe, so it is read once under a lock and cached.
+    """
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            _umask = os.umask(0)
+            os.umask(_umask)
+        return _umask
+
+
+class AtomicOutputFile:
+    """Write an output file atomically, leaving it untouched if unchanged.
+
+    Content is streamed to a temporary file next to the target while being
+    hashed. On close, the temporary file replaces the target with
+    os.replace(), unless the target already has identical content, in which
+    case the target (and its mtime) is left alone.
+
+    Text is encoded as UTF-8 and written without newline translation, so
+    identical input always produces byte-identical output.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.changed: Optional[bool] = None
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._tmp_path: Optional[str] = None
+        self._file = None
+
+    def __enter__(self) -> "AtomicOutputFile":
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        self._file = os.fdopen(fd, "wb")
+        return self
+
+    @property
+    def size(self) -> int:
+        """Number of bytes written so far."""
+        return self._size
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 hex digest of the bytes written so far."""
+        return self._hash.hexdigest()
+
+    def write(self, data: Union[str, bytes]):
+        """Write text or bytes to the temporary file."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._file.write(data)
+        self._hash.update(data)
+        self._size += len(data)
+
+    def _matches_existing(self) -> bool:
+        """Check whether the target already has exactly the written content."""
+        try:
+            if os.stat(self.path).st_size != self._size:
+                return False
+            existing = hashlib.sha256()
+            with open(self.path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    existing.update(chunk)
+            return existing.digest() == self._hash.digest()
+        except OSError:
+            return False
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        if exc_type is not None:
+            os.unlink(self._tmp_path)
+            return False
+
+        if self._matches_existing():
+            os.unlink(self._tmp_path)
+            self.changed = False
+            logger.debug(f"sphinx-llms-txt: {self.path} is unchanged")
+            return False
+
+        # mkstemp creates files readable only by the owner
+        if self.path.exists():
+            shutil.copymode(self.path, self._tmp_path)
+        else:
+            os.chmod(self._tmp_path, 0o666 & ~_get_umask())
+        os.replace(self._tmp_path, self.path)
+        self.changed = True
+        return False
+
+
+class ShardWriter:
+    """Split the pages of llms-full.txt into size-bounded shard files.
+
+    Shards are named after the output file, e.g. ``llms-full-001.txt``. Pages
+    are never split: a shard is closed before a page that would take it over
+    the limit, so a page larger than the limit gets a shard of its own.
+
+    With the "content" boundary, shards are additionally cut before pages
+    whose leading text hashes onto a boundary, aiming for shards of about
+    half the limit. Because the decision depends on the page itself rather
+    than its offset, editing a page only changes the shards around it.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        max_size: int,
+        unit: str = "bytes",
+        boundary: str = "size",
+    ):
+        output_path = Path(output_path)
+        self.output_path = output_path
+        self.max_size = max_size
+        self.unit = unit
+        self.boundary = boundary
+        self.shards: List[Dict[str, Any]] = []
+        self._file: Optional[AtomicOutputFile] = None
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._close_shard(exc_type, exc_value, traceback)
+        return False
+
+    def shard_path(self, number: int) -> Path:
+        """Return the path of the shard with the given 1-based number."""
+        path = self.output_path
+        return path.with_name(f"{path.stem}-{number:03d}{path.suffix}")
+
+    def _open_shard(self):
+        path = self.shard_path(len(self.shards) + 1)
+        self._file = AtomicOutputFile(path).__enter__()
+        self.shards.append(
+            {
+                "file": path.name,
+                "docnames": [],
+                "bytes": 0,
+                "lines": 0,
+                "tokens": 0,
+                "sha256": None,
+            }
+        )
+
+    def _close_shard(self, exc_type=None, exc_value=None, traceback=None):
+        if self._file is None:
+            return
+        file, self._file = self._file, None
+        file.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.shards[-1]["sha256"] = file.sha256
+
+    def _should_cut(self, text: str, part: str) -> bool:
+        """Check whether the current shard should be closed before this text."""
+        current = self.shards[-1][self.unit]
+        added = measure_text(text, self.unit)
+        if current + added > self.max_size:
+            return True
+        if self.boundary != "content":
+            return False
+
+        # Cut with a probability proportional to the page size, so shards
+        # average the target size, but avoid tiny shards
+        target = max(self.max_size // 2, 1)
+        if current < target // 4:
+            return False
+        window = part[:BOUNDARY_WINDOW].encode("utf-8")
+        return zlib.crc32(window) % target < added
+
+    def add(self, part: str, docname: Optional[str] = None):
+        """Add one page (or other content part) to the current shard.
+
+        Args:
+            part: The content to add
+            docname: The document the content came from, if any
+        """
+        text = part
+        if self._file is not None:
+            text = "\n" + part
+            if self._should_cut(text, part):
+                self._close_shard()
+                text = part
+        if self._file is None:
+            self._open_shard()
+
+        self._file.write(text)
+        shard = self.shards[-1]
+        for unit in SHARD_UNITS:
+            shard[unit] += measure_text(text, unit)
+        if docname is not None:
+            shard["docnames"].append(docname)
+
+    def remove_stale_shards(self):
+        """Delete shards left over from a previous build with more shards."""
+        path = self.output_path
+        pattern = re.compile(
+            rf"{re.escape(path.stem)}-\d{{3,}}{re.escape(path.suffix)}"
+        )
+        current = {shard["file"] for shard in self.shards}
+        for candidate in path.parent.glob(f"{path.stem}-*{path.suffix}"):
+            if pattern.fullmatch(candidate.name) and candidate.name not in current:
+                candidate.unlink()
+                logger.debug(f"sphinx-llms-txt: Removed stale shard {candidate}")
+
+    def manifest_path(self) -> Path:
+        """Return the path of the shard manifest, e.g. llms-full.manifest.json."""
+        path = self.output_path
+        return path.with_name(f"{path.stem}.manifest.json")
+
+    def write_manifest(self) -> Path:
+        """Write the manifest listing each shard's docnames, size and hash."""
+        manifest = {
+            "source": self.output_path.name,
+            "unit": self.unit,
+            "max_size": self.max_size,
+            "boundary": self.boundary,
+            "shards": self.shards,
+        }
+        manifest_path = self.manifest_path()
+        with AtomicOutputFile(manifest_path) as f:
+            f.write(json.dumps(manifest, indent=2) + "\n")
+        return manifest_path
+
+
+def _create_compressor(
+    compression: str, level: Optional[int] = None
+) -> Optional[Tuple[Callable[[bytes], bytes], Callable[[], bytes]]]:
+    """Create a streaming compressor for one of COMPRESSION_SUFFIXES.
+
+    Args:
+        compression: The format name ("gz", "br" or "zst")
+        level: Compression level, or None for the format's default
+
+    Returns:
+        Tuple of (compress, flush) callables, or None if the compressor
+        for the format isn't installed
+    """
+    if compression == "gz":
+        compressor = zlib.compressobj(
+            9 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+        return compressor.compress, compressor.flush
+
+    if compression == "br":
+        try:
+            import brotli
+        except ImportError:
+            return None
+        compressor = (
+            brotli.Compressor() if level is None else brotli.Compressor(quality=level)
+        )
+        return compressor.process, compressor.finish
+
+    if compression == "zst":
+        try:
+            from compression import zstd
+
+            compressor = (
+                zstd.ZstdCompressor() if level is None else zstd.ZstdCompressor(level)
+            )
+            return compressor.compress, compressor.flush
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            return None
+        compressor = (
+            zstandard.ZstdCompressor()
+            if level is None
+            else zstandard.ZstdCompressor(level=level)
+        ).compressobj()
+        return compressor.compress, compressor.flush
+
+    return None
+
 
 class FileWriter:
     """Handles writing processed content to output files."""
@@ -19,6 +420,25 @@ class FileWriter:
         self.outdir = outdir
         self.app = app
 
+    def _validate_uri_template(self, uri_template: str) -> Optional[Exception]:
+        """Validate a URI template by checking for valid variable names.
+
+        Returns:
+            None if the template is valid, otherwise the formatting error
+        """
+        try:
+            # Try formatting with test valid values to validate syntax
+            test_values = {
+                "base_url": "http://example.com/",
+                "docname": "test",
+                "suffix": ".rst",
+                "sourcelink_suffix": ".txt",
+            }
+            uri_template.format(**test_values)
+            return None
+        except (KeyError, ValueError, IndexError) as e:
+            return e
+
     def _resolve_uri_template(self, sources_dir: Path = None) -> str:
         """Resolve which URI template to use based on configuration and sources_dir.
 
@@ -32,22 +452,13 @@ class FileWriter:
         custom_template = self.config.get("llms_txt_uri_template")
 
         if custom_template:
-            # Validate user's template by checking for valid variable names
-            try:
-                # Try formatting with test valid values to validate syntax
-                test_values = {
-                    "base_url": "http://example.com/",
-                    "docname": "test",
-                    "suffix": ".rst",
-                    "sourcelink_suffix": ".txt",
-                }
-                custom_template.format(**test_values)
+            error = self._validate_uri_template(custom_template)
+            if error is None:
                 return custom_template
-            except (KeyError, ValueError) as e:
-                logger.warning(
-                    f"sphinx-llms-txt: Invalid llms_txt_uri_template: {e}. "
-                    f"Falling back to default."
-                )
+            logger.warning(
+                f"sphinx-llms-txt: Invalid llms_txt_uri_template: {error}. "
+                f"Falling back to default."
+            )
 
         # Else, use one of the default templates
         if sources_dir:
@@ -55,46 +466,545 @@ class FileWriter:
         else:
             return "{base_url}{docname}.html"
 
+    def _get_compressors(
+        self, output_path: Path
+    ) -> List[Tuple[Path, Callable[[bytes], bytes], Callable[[], bytes]]]:
+        """Create the configured precompressors for an output file.
+
+        Formats whose compressor isn't installed are skipped.
+
+        Returns:
+            List of (compressed output path, compress, flush) tuples
+        """
+        level = self.config.get("llms_txt_full_compress_level")
+        compressors = []
+        for compression in self.config.get("llms_txt_full_compress") or []:
+            if compression not in COMPRESSION_SUFFIXES:
+                logger.warning(
+                    f"sphinx-llms-txt: Unknown llms_txt_full_compress format "
+                    f"'{compression}'. Valid options: "
+                    f"{', '.join(COMPRESSION_SUFFIXES)}."
+                )
+                continue
+
+            format_level = level
+            lowest, highest = COMPRESSION_LEVELS[compression]
+            if format_level is not None and (
+                not isinstance(format_level, int)
+                or isinstance(format_level, bool)
+                or not lowest <= format_level <= highest
+            ):
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid llms_txt_full_compress_level "
+                    f"{format_level!r} for '{compression}'. Expected an integer "
+                    f"from {lowest} to {highest}, using the default level."
+                )
+                format_level = None
+
+            try:
+                compressor = _create_compressor(compression, format_level)
+            except Exception as e:
+                logger.warning(
+                    f"sphinx-llms-txt: Could not create the '{compression}' "
+                    f"compressor: {e}. Skipping {output_path.name}"
+                    f"{COMPRESSION_SUFFIXES[compression]}"
+                )
+                continue
+            if compressor is None:
+                logger.info(
+                    f"sphinx-llms-txt: Compressor for '{compression}' is not "
+                    f"installed, skipping {output_path.name}"
+                    f"{COMPRESSION_SUFFIXES[compression]}"
+                )
+                continue
+
+            compressed_path = output_path.with_name(
+                output_path.name + COMPRESSION_SUFFIXES[compression]
+            )
+            compressors.append((compressed_path, *compressor))
+        return compressors
+
+    def _get_shard_writer(self, output_path: Path) -> Optional[ShardWriter]:
+        """Create the shard writer configured with llms_txt_full_shard_size.
+
+        Returns:
+            A ShardWriter, or None if sharding is disabled
+        """
+        max_size = self.config.get("llms_txt_full_shard_size")
+        if max_size is None:
+            return None
+        if not isinstance(max_size, int) or isinstance(max_size, bool) or max_size < 1:
+            logger.warning(
+                f"sphinx-llms-txt: Invalid llms_txt_full_shard_size {max_size!r}. "
+                f"Expected a positive integer, not writing shards."
+            )
+            return None
+
+        unit = self.config.get("llms_txt_full_shard_unit") or "bytes"
+        if unit not in SHARD_UNITS:
+            logger.warning(
+                f"sphinx-llms-txt: Invalid llms_txt_full_shard_unit '{unit}'. "
+                f"Valid options: {', '.join(SHARD_UNITS)}. Using 'bytes'."
+            )
+            unit = "bytes"
+
+        boundary = self.config.get("llms_txt_full_shard_boundary") or "size"
+        if boundary not in SHARD_BOUNDARIES:
+            logger.warning(
+                f"sphinx-llms-txt: Invalid llms_txt_full_shard_boundary "
+                f"'{boundary}'. Valid options: {', '.join(SHARD_BOUNDARIES)}. "
+                f"Using 'size'."
+            )
+            boundary = "size"
+        return ShardWriter(output_path, max_size, unit, boundary)
+
     def write_combined_file(
-        self, content_parts: List[str], output_path: Path, total_line_count: int
+        self,
+        content_parts: List[str],
+        output_path: Path,
+        total_line_count: int,
+        docnames: Optional[List[Optional[str]]] = None,
     ) -> bool:
         """Write the combined content to a file.
 
+        Precompressed siblings configured with llms_txt_full_compress and
+        shards configured with llms_txt_full_shard_size are produced
+        incrementally as each part is written.
+
         Args:
             content_parts: List of content strings to combine
             output_path: Path to write the output file
             total_line_count: Total number of lines in the content
+            docnames: The document each content part came from (None for parts
+                that don't belong to a document), listed in the shard manifest
 
         Returns:
             True if successful, False otherwise
         """
+        output_path = Path(output_path)
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(content_parts))
+            compressors = self._get_compressors(output_path)
+            shards = self._get_shard_writer(output_path)
+            with ExitStack() as stack:
+                f = stack.enter_context(AtomicOutputFile(output_path))
+                compressed_streams = [
+                    (stack.enter_context(AtomicOutputFile(path)), compress, flush)
+                    for path, compress, flush in compressors
+                ]
+                if shards:
+                    stack.enter_context(shards)
+                page_index = {} if self.config.get("llms_txt_full_index") else None
+                write_delta = self.config.get("llms_txt_full_delta") and docnames
+
+                for index, part in enumerate(content_parts):
+                    text = part if index == 0 else "\n" + part
+                    if page_index is not None and docnames and docnames[index]:
+                        # The page starts after the separator
+                        start = f.size + len(text) - len(part)
+                        page_index[docnames[index]] = self._index_page(part, start)
+                    f.write(text)
+                    if compressed_streams:
+                        data = text.encode("utf-8")
+                        for stream, compress, _ in compressed_streams:
+                            stream.write(compress(data))
+                    if shards:
+                        shards.add(part, docnames[index] if docnames else None)
+
+                for stream, _, flush in compressed_streams:
+                    stream.write(flush())
 
             logger.info(
                 f"sphinx-llms-txt: Created {output_path} with {len(content_parts)}"
                 f" sources and {total_line_count} lines"
             )
+            for path, _, _ in compressors:
+                logger.info(f"sphinx-llms-txt: Created {path}")
+            if write_delta:
+                delta_path = self._write_delta(
+                    output_path, f.sha256, content_parts, docnames
+                )
+                logger.info(f"sphinx-llms-txt: Created {delta_path}")
+            if page_index is not None:
+                index_path = self._write_page_index(output_path, page_index)
+                logger.info(f"sphinx-llms-txt: Created {index_path}")
+            if shards:
+                shards.remove_stale_shards()
+                manifest_path = shards.write_manifest()
+                logger.info(
+                    f"sphinx-llms-txt: Created {len(shards.shards)} shards of "
+                    f"{output_path.name} listed in {manifest_path}"
+                )
             return True
         except Exception as e:
             logger.error(f"sphinx-llms-txt: Error writing combined sources file: {e}")
             return False
 
+    def _index_page(self, content: str, start: int) -> Dict[str, Any]:
+        """Compute the byte ranges of a page and its sections in llms-full.txt.
+
+        Args:
+            content: The page content
+            start: Byte offset of the page in the combined file
+
+        Returns:
+            Dict with the page's ``start`` and ``end`` offsets and its
+            ``sections``, each with a title, level, start and end
+        """
+        end = start + len(content.encode("utf-8"))
+        headings = find_section_headings(content)
+        sections = []
+        for number, (title, level, offset) in enumerate(headings):
+            next_offset = (
+                start + headings[number + 1][2] if number + 1 < len(headings) else end
+            )
+            sections.append(
+                {
+                    "title": title,
+                    "level": level,
+                    "start": start + offset,
+                    "end": next_offset,
+                }
+            )
+        return {"start": start, "end": end, "sections": sections}
+
+    def _write_delta(
+        self,
+        output_path: Path,
+        full_hash: str,
+        content_parts: List[str],
+        docnames: List[Optional[str]],
+    ) -> Path:
+        """Write the per-page delta of llms-full.txt against the previous build.
+
+        Page hashes of each build are kept in e.g. llms-full.hashes.json next
+        to the output, and compared with the pages just written. The delta,
+        e.g. llms-full.delta.json, holds the content of added and changed
+        pages, the removed docnames, and the new page order. Consecutive parts
+        that don't belong to a document are treated as one page keyed
+        CODE_FILES_KEY, so joining the pages in order with newlines rebuilds
+        the whole file.
+
+        Args:
+            output_path: Path of the combined file
+            full_hash: SHA-256 of the combined file just written
+            content_parts: The content parts of the combined file
+            docnames: The document each content part came from
+
+        Returns:
+            The path of the delta file
+        """
+        hashes_path = output_path.with_name(f"{output_path.stem}.hashes.json")
+        previous = load_json(hashes_path)
+        previous_pages = previous.get("pages", {})
+
+        blocks = []
+        for part, docname in zip(content_parts, docnames):
+            if docname is None and blocks and blocks[-1][0] is None:
+                blocks[-1][1].append(part)
+            else:
+                blocks.append((docname, [part]))
+
+        pages = {}
+        added = {}
+        changed = {}
+        for docname, parts in blocks:
+            key = docname
+            if key is None:
+                key = CODE_FILES_KEY
+                number = 2
+                while key in pages:
+                    key = f"{CODE_FILES_KEY}-{number}"
+                    number += 1
+            part = "\n".join(parts)
+            pages[key] = hash_text(part)
+            if key not in previous_pages:
+                added[key] = part
+            elif previous_pages[key] != pages[key]:
+                changed[key] = part
+
+        delta = {
+            "source": output_path.name,
+            "previous_sha256": previous.get("sha256"),
+            "sha256": full_hash,
+            "added": added,
+            "changed": changed,
+            "removed": [d for d in previous_pages if d not in pages],
+            "order": list(pages),
+        }
+        delta_path = output_path.with_name(f"{output_path.stem}.delta.json")
+        with AtomicOutputFile(delta_path) as f:
+            f.write(json.dumps(delta, indent=2, ensure_ascii=False) + "\n")
+        with AtomicOutputFile(hashes_path) as f:
+            f.write(json.dumps({"sha256": full_hash, "pages": pages}, indent=2) + "\n")
+        return delta_path
+
+    def _write_page_index(
+        self, output_path: Path, pages: Dict[str, Dict[str, Any]]
+    ) -> Path:
+        """Write the byte-offset index of llms-full.txt, e.g. llms-full.index.json.
+
+        Offsets are in bytes with exclusive ends, suitable for HTTP Range
+        requests (``bytes=start-(end - 1)``) or slicing a memory map.
+        """
+        index_path = output_path.with_name(f"{output_path.stem}.index.json")
+        data = {"source": output_path.name, "pages": pages}
+        with AtomicOutputFile(index_path) as f:
+            f.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+        return index_path
+
+    def write_section_file(self, content_parts: List[str], output_path: Path) -> bool:
+        """Write the combined content of one toctree section to a file.
+
+        Args:
+            content_parts: List of content strings to combine
+            output_path: Path to write the output file
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with AtomicOutputFile(output_path) as f:
+                for index, part in enumerate(content_parts):
+                    f.write(part if index == 0 else "\n" + part)
+            logger.debug(
+                f"sphinx-llms-txt: Created {output_path} with {len(content_parts)}"
+                f" sources"
+            )
+            return True
+        except Exception as e:
+            logger.error(f"sphinx-llms-txt: Error writing section file: {e}")
+            return False
+
+    def _compile_uri_template(
+        self, uri_template: str, base_url: str, sourcelink_suffix: str
+    ) -> Callable[..., str]:
+        """Compile a URI template into a formatter of the per-page fields.
+
+        Fields that are the same for every page are substituted once, so each
+        link only has to format ``docname`` and ``suffix``.
+
+        Args:
+            uri_template: The template string to compile
+            base_url: Value for the ``{base_url}`` field
+            sourcelink_suffix: Value for the ``{sourcelink_suffix}`` field
+
+        Returns:
+            A callable taking ``docname`` and ``suffix`` keyword arguments
+        """
+        constants = {"base_url": base_url, "sourcelink_suffix": sourcelink_suffix}
+        conversions = {"r": repr, "s": str, "a": ascii}
+
+        def escape(text: str) -> str:
+            return text.replace("{", "{{").replace("}", "}}")
+
+        compiled = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(
+            uri_template
+        ):
+            compiled.append(escape(literal))
+            if field_name is None:
+                continue
+            if field_name in constants:
+                value = constants[field_name]
+                if conversion:
+                    value = conversions[conversion](value)
+                compiled.append(escape(format(value, format_spec or "")))
+            else:
+                conversion = f"!{conversion}" if conversion else ""
+                format_spec = f":{format_spec}" if format_spec else ""
+                compiled.append(f"{{{field_name}{conversion}{format_spec}}}")
+
+        return "".join(compiled).format
+
+    def _normalize_page_order(
+        self, page_order: Union[List[str], List[Tuple[str, str]]]
+    ) -> List[Tuple[str, Optional[str]]]:
+        """Convert a page order to (docname, suffix) tuples.
+
+        Plain docnames are the legacy format and get a suffix of None.
+        """
+        if all(isinstance(item, tuple) for item in page_order):
+            return page_order
+        return [
+            item if isinstance(item, tuple) else (item, None) for item in page_order
+        ]
+
+    def _get_sourcelink_suffix(self) -> str:
+        """Get the html_sourcelink_suffix from Sphinx config, with a leading dot."""
+        sourcelink_suffix = ""
+        if self.app and hasattr(self.app.config, "html_sourcelink_suffix"):
+            sourcelink_suffix = self.app.config.html_sourcelink_suffix
+            # Handle empty string case specially
+            if sourcelink_suffix == "":
+                sourcelink_suffix = ""  # Keep it empty
+            elif not sourcelink_suffix.startswith("."):
+                sourcelink_suffix = "." + sourcelink_suffix
+        return sourcelink_suffix
+
+    def _render_header(
+        self,
+        section_links: Optional[List[Tuple[str, str]]] = None,
+        index_links: Optional[List[Tuple[str, str]]] = None,
+        title: Optional[str] = None,
+        summary: Optional[str] = None,
+        docs: bool = True,
+    ) -> str:
+        """Render the llms.txt heading, summary and docs section heading.
+
+        Args:
+            section_links: Optional list of (title, URI) pairs of per-section
+                files, listed before the docs
+            index_links: Optional list of (title, URI) pairs of nested
+                indexes, listed before the docs
+            title: Heading to use instead of the project title
+            summary: Summary to use instead of llms_txt_summary
+            docs: Whether to end with the docs section heading
+        """
+        header = []
+        project_name = "llms-txt Summary"
+        if title:
+            project_name = title
+        # First priority: use title from config if available
+        elif self.config.get("llms_txt_title"):
+            project_name = self.config.get("llms_txt_title")
+        # Second priority: use project name from Sphinx app if available
+        elif (
+            self.app
+            and hasattr(self.app, "config")
+            and hasattr(self.app.config, "project")
+        ):
+            project_name = self.app.config.project
+        header.append(f"# {project_name}\n\n")
+
+        # Add description if available
+        description = (
+            summary if summary is not None else self.config.get("llms_txt_summary", "")
+        )
+        if description:
+            # Trim leading and trailing whitespace
+            description = description.strip()
+            if description:
+                # Only add blockquote if description is not empty
+                # Replace newlines with newline + blockquote marker to maintain
+                # blockquote formatting
+                description = description.replace("\n", "\n> ")
+                header.append(f"> {description}\n\n")
+
+        if section_links:
+            header.append("## Sections\n\n")
+            header.extend(f"- [{title}]({uri})\n" for title, uri in section_links)
+            header.append("\n")
+
+        if index_links:
+            header.append("## Indexes\n\n")
+            header.extend(f"- [{title}]({uri})\n" for title, uri in index_links)
+            header.append("\n")
+
+        if docs:
+            header.append("## Docs\n\n")
+        return "".join(header)
+
+    def _render_link_batches(
+        self,
+        page_order: List[Tuple[str, Optional[str]]],
+        page_titles: Dict[str, str],
+        formatters: List[Callable[..., str]],
+        page_descriptions: Optional[Dict[str, str]] = None,
+        page_stats: Optional[Dict[str, Tuple[str, int]]] = None,
+    ) -> Iterator[List[str]]:
+        """Render llms.txt link lines in batches, for several URI formatters.
+
+        Titles, descriptions and stats are looked up once per page and shared
+        by every formatter, so all link variants come from a single traversal.
+
+        Args:
+            page_order: Ordered list of (docname, suffix) tuples
+            page_titles: Dictionary mapping docnames to titles
+            formatters: Compiled URI formatters from _compile_uri_template
+            page_descriptions: Optional dictionary mapping docnames to
+                single-line descriptions
+            page_stats: Optional dictionary mapping docnames to the
+                (short content hash, size in bytes) of each page's part of
+                llms-full.txt
+
+        Yields:
+            For each batch, the rendered text for each formatter, in order
+        """
+        get_title = page_titles.get
+        get_description = (page_descriptions or {}).get
+        get_stats = (page_stats or {}).get
+
+        for start in range(0, len(page_order), RENDER_BATCH_SIZE):
+            batch = page_order[start : start + RENDER_BATCH_SIZE]
+            rendered = [[] for _ in formatters]
+            for docname, suffix in batch:
+                title = get_title(docname, docname)
+                description = get_description(docname)
+                stats = get_stats(docname)
+                if stats:
+                    stats_note = f"(sha256:{stats[0]}, {stats[1]} bytes)"
+                    description = (
+                        f"{description} {stats_note}" if description else stats_note
+                    )
+                tail = f"): {description}\n" if description else ")\n"
+                suffix = suffix or ""
+                for lines, format_uri in zip(rendered, formatters):
+                    lines.append(
+                        f"- [{title}]({format_uri(docname=docname, suffix=suffix)}"
+                        + tail
+                    )
+            yield ["".join(lines) for lines in rendered]
+
+    def _get_uri_variants(self) -> List[Tuple[str, str]]:
+        """Get the valid (filename, uri_template) pairs of llms_txt_uri_variants."""
+        variants = []
+        for variant in self.config.get("llms_txt_uri_variants") or []:
+            try:
+                filename, uri_template = variant
+            except (TypeError, ValueError):
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid llms_txt_uri_variants entry: "
+                    f"{variant!r}. Expected a (filename, uri_template) pair."
+                )
+                continue
+
+            error = self._validate_uri_template(uri_template)
+            if error is not None:
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid URI template for {filename}: "
+                    f"{error}. Skipping."
+                )
+                continue
+            variants.append((filename, uri_template))
+        return variants
+
     def write_verbose_info_to_file(
         self,
         page_order: Union[List[str], List[Tuple[str, str]]],
         page_titles: Dict[str, str],
         total_line_count: int = 0,
         sources_dir: Path = None,
+        page_descriptions: Dict[str, str] = None,
+        page_stats: Dict[str, Tuple[str, int]] = None,
+        section_files: List[Tuple[str, str]] = None,
     ) -> bool:
         """Write summary information to the llms.txt file.
 
+        Files listed in llms_txt_uri_variants are written in the same pass,
+        each with its own URI template.
+
         Args:
             page_order: Ordered list of document names or (docname, suffix) tuples
             page_titles: Dictionary mapping docnames to titles
             total_line_count: Total number of lines in the combined content
             sources_dir: Path to _sources directory (None if not found)
+            page_descriptions: Optional dictionary mapping docnames to
+                single-line descriptions
+            page_stats: Optional dictionary mapping docnames to the
+                (short content hash, size in bytes) of each page's part of
+                llms-full.txt, shown after its link
+            section_files: Optional list of (title, path relative to outdir)
+                of per-section files to link before the docs
 
         Returns:
             True if successful, False otherwise
@@ -107,73 +1017,215 @@ class FileWriter:
 
         output_path = Path(self.outdir) / self.config.get("llms_txt_filename")
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                project_name = "llms-txt Summary"
-                # First priority: use title from config if available
-                if self.config.get("llms_txt_title"):
-                    project_name = self.config.get("llms_txt_title")
-                # Second priority: use project name from Sphinx app if available
-                elif (
-                    self.app
-                    and hasattr(self.app, "config")
-                    and hasattr(self.app.config, "project")
+            # Get base URL from config
+            base_url = self.config.get("html_baseurl", "/")
+            # Ensure base_url ends with a trailing slash
+            if not base_url.endswith("/"):
+                base_url += "/"
+            sourcelink_suffix = self._get_sourcelink_suffix()
+
+            # Resolve which templates to use and compile each one once
+            outputs = [(output_path, self._resolve_uri_template(sources_dir))]
+            outputs.extend(
+                (Path(self.outdir) / filename, uri_template)
+                for filename, uri_template in self._get_uri_variants()
+            )
+            formatters = [
+                self._compile_uri_template(uri_template, base_url, sourcelink_suffix)
+                for _, uri_template in outputs
+            ]
+
+            header = self._render_header(
+                [(title, base_url + path) for title, path in section_files or []]
+            )
+            with ExitStack() as stack:
+                streams = [
+                    stack.enter_context(AtomicOutputFile(path)) for path, _ in outputs
+                ]
+                for stream in streams:
+                    stream.write(header)
+
+                for batch in self._render_link_batches(
+                    self._normalize_page_order(page_order),
+                    page_titles,
+                    formatters,
+                    page_descriptions,
+                    page_stats,
                 ):
-                    project_name = self.app.config.project
-                f.write(f"# {project_name}\n\n")
-
-                # Add description if available
-                description = self.config.get("llms_txt_summary", "")
-                if description:
-                    # Trim leading and trailing whitespace
-                    description = description.strip()
-                    if description:
-                        # Only add blockquote if description is not empty
-                        # Replace newlines with newline + blockquote marker to maintain
-                        # blockquote formatting
-                        description = description.replace("\n", "\n> ")
-                        f.write(f"> {description}\n\n")
-
-                f.write("## Docs\n\n")
-                # Get base URL from config
-                base_url = self.config.get("html_baseurl", "/")
-                # Ensure base_url ends with a trailing slash
-                if not base_url.endswith("/"):
-                    base_url += "/"
-
-                # Get sourcelink suffix from Sphinx config
-                sourcelink_suffix = ""
-                if self.app and hasattr(self.app.config, "html_sourcelink_suffix"):
-                    sourcelink_suffix = self.app.config.html_sourcelink_suffix
-                    # Handle empty string case specially
-                    if sourcelink_suffix == "":
-                        sourcelink_suffix = ""  # Keep it empty
-                    elif not sourcelink_suffix.startswith("."):
-                        sourcelink_suffix = "." + sourcelink_suffix
-
-                # Resolve which template to use
-                uri_template = self._resolve_uri_template(sources_dir)
-
-                for item in page_order:
-                    # Handle both old format (str) and new format (tuple)
-                    if isinstance(item, tuple):
-                        docname, suffix = item
-                    else:
-                        docname = item
-                        suffix = None
-
-                    title = page_titles.get(docname, docname)
-
-                    uri = uri_template.format(
-                        base_url=base_url,
-                        docname=docname,
-                        suffix=suffix or "",
-                        sourcelink_suffix=sourcelink_suffix,
+                    for stream, text in zip(streams, batch):
+                        stream.write(text)
+
+            for path, _ in outputs:
+                logger.info(f"sphinx-llms-txt: created {path}")
+            return True
+        except Exception as e:
+            logger.error(f"sphinx-llms-txt: Error writing verbose info to file: {e}")
+            return False
+
+    def write_nested_index(
+        self,
+        index_tree: Dict[str, Any],
+        page_titles: Dict[str, str],
+        sources_dir: Path = None,
+        page_descriptions: Dict[str, str] = None,
+        page_stats: Dict[str, Tuple[str, int]] = None,
+        section_files: List[Tuple[str, str]] = None,
+    ) -> bool:
+        """Write llms.txt as a tree of indexes following the toctree.
+
+        The root llms.txt links to one index per section, written to a
+        directory named after it (``llms/api.txt``), which in turn links to the
+        indexes of its subsections. With llms_txt_index_max_entries set, the
+        links of an index are split over continuation files (``api.2.txt``)
+        listed under "More". Files listed in llms_txt_uri_variants get their
+        own tree of indexes.
+
+        Args:
+            index_tree: Root node from LLMSFullManager._build_index_tree, with
+                the ``docname`` and file ``name`` of each section, its own
+                ``pages`` and its child ``sections``
+            page_titles: Dictionary mapping docnames to titles
+            sources_dir: Path to _sources directory (None if not found)
+            page_descriptions: Optional dictionary mapping docnames to
+                single-line descriptions
+            page_stats: Optional dictionary mapping docnames to the
+                (short content hash, size in bytes) of each page's part of
+                llms-full.txt, shown after its link
+            section_files: Optional list of (title, path relative to outdir)
+                of per-section files to link from the root index
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.outdir:
+            logger.warning(
+                "sphinx-llms-txt: Cannot write nested indexes: outdir not set"
+            )
+            return False
+
+        outdir = Path(self.outdir)
+        output_path = outdir / self.config.get("llms_txt_filename")
+        try:
+            base_url = self.config.get("html_baseurl", "/")
+            if not base_url.endswith("/"):
+                base_url += "/"
+            sourcelink_suffix = self._get_sourcelink_suffix()
+            max_entries = self.config.get("llms_txt_index_max_entries") or 0
+            try:
+                max_entries = max(int(max_entries), 0)
+            except (TypeError, ValueError):
+                logger.warning(
+                    f"sphinx-llms-txt: Invalid llms_txt_index_max_entries: "
+                    f"{max_entries!r}. Expected an integer."
+                )
+                max_entries = 0
+
+            outputs = [(output_path, self._resolve_uri_template(sources_dir))]
+            outputs.extend(
+                (outdir / filename, uri_template)
+                for filename, uri_template in self._get_uri_variants()
+            )
+            descriptions = page_descriptions or {}
+            index_files = []
+
+            for path, uri_template in outputs:
+                index_dir = path.parent / path.stem
+                format_uri = self._compile_uri_template(
+                    uri_template, base_url, sourcelink_suffix
+                )
+                written = set()
+
+                def index_uri(name: str) -> str:
+                    relpath = (index_dir / f"{name}.txt").relative_to(outdir)
+                    return base_url + relpath.as_posix()
+
+                def write_index(node: Dict[str, Any], node_path: Path, root: bool):
+                    pages = node["pages"]
+                    chunk_size = max_entries or len(pages) or 1
+                    chunks = [
+                        pages[start : start + chunk_size]
+                        for start in range(0, len(pages), chunk_size)
+                    ]
+                    title = None
+                    summary = None
+                    if not root:
+                        title = page_titles.get(node["docname"], node["docname"])
+                        summary = descriptions.get(node["docname"], "")
+
+                    index_links = [
+                        (
+                            page_titles.get(child["docname"], child["docname"]),
+                            index_uri(child["name"]),
+                        )
+                        for child in node["sections"]
+                    ]
+                    more_links = [
+                        (
+                            f"{title or 'Docs'} ({number})",
+                            index_uri(f"{node['name']}.{number}"),
+                        )
+                        for number in range(2, len(chunks) + 1)
+                    ]
+
+                    files = [(node_path, chunks[0] if chunks else [])]
+                    files.extend(
+                        (index_dir / f"{node['name']}.{number}.txt", chunk)
+                        for number, chunk in enumerate(chunks[1:], start=2)
                     )
+                    for number, (file_path, chunk) in enumerate(files, start=1):
+                        first = number == 1
+                        header = self._render_header(
+                            (
+                                [
+                                    (section_title, base_url + section_path)
+                                    for section_title, section_path in section_files
+                                    or []
+                                ]
+                                if root and first
+                                else None
+                            ),
+                            index_links if first else None,
+                            title,
+                            summary if first else "",
+                            bool(chunk),
+                        )
+                        file_path.parent.mkdir(parents=True, exist_ok=True)
+                        with AtomicOutputFile(file_path) as stream:
+                            stream.write(header)
+                            for (text,) in self._render_link_batches(
+                                chunk,
+                                page_titles,
+                                [format_uri],
+                                page_descriptions,
+                                page_stats,
+                            ):
+                                stream.write(text)
+                            if first and more_links:
+                                stream.write("\n## More\n\n")
+                                stream.write(
+                                    "".join(
+                                        f"- [{text}]({uri})\n"
+                                        for text, uri in more_links
+                                    )
+                                )
+                        written.add(file_path)
 
-                    f.write(f"- [{title}]({uri})\n")
+                    for child in node["sections"]:
+                        write_index(child, index_dir / f"{child['name']}.txt", False)
 
-            logger.info(f"sphinx-llms-txt: created {output_path}")
+                write_index(index_tree, path, True)
+                index_files.extend(written - {path})
+
+                logger.info(
+                    f"sphinx-llms-txt: created {path} with "
+                    f"{len(written) - 1} nested indexes"
+                )
+
+            # Remove indexes of sections that no longer exist
+            remove_stale_outputs(
+                get_cache_dir(self.app), outdir, "indexes", index_files
+            )
             return True
         except Exception as e:
-            logger.error(f"sphinx-llms-txt: Error writing verbose info to file: {e}")
+            logger.error(f"sphinx-llms-txt: Error writing nested indexes: {e}")
             return False
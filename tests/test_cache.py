@@ -0,0 +1,210 @@
+"""Test the build cache for processed pages."""
+
+from sphinx_llms_txt import DocumentProcessor
+from sphinx_llms_txt.cache import ProcessedPageCache, hash_text
+
+
+def test_process_includes_records_page_includes(tmp_path):
+    """Test that include directives are recorded per page with their hashes."""
+    processor = DocumentProcessor({"llms_txt_directives": []})
+
+    snippet = tmp_path / "snippet.rst"
+    snippet.write_text("Shared snippet.")
+
+    source_file = tmp_path / "page.rst"
+    content = ".. include:: snippet.rst\n.. include:: missing.rst\n"
+    processor._process_includes(content, source_file, "page")
+    processor._process_includes(content, source_file, "other")
+
+    snippet_key = str(snippet.resolve())
+    missing_key = str((tmp_path / "missing.rst").resolve())
+    for docname in ("page", "other"):
+        assert processor.get_page_includes(docname) == {
+            snippet_key: hash_text("Shared snippet."),
+            missing_key: None,
+        }
+
+
+def test_changed_include_invalidates_only_dependents(tmp_path):
+    """Test that a changed snippet only invalidates the pages including it."""
+    cache_dir = tmp_path / "doctrees"
+    snippet = tmp_path / "snippet.rst"
+    snippet.write_text("Version 1")
+
+    cache = ProcessedPageCache(cache_dir, "config")
+    cache.put(
+        "uses_snippet", "src1", "processed 1", {str(snippet): hash_text("Version 1")}
+    )
+    cache.put("standalone", "src2", "processed 2", {})
+    cache.save()
+
+    # Unchanged snippet: everything is reused
+    cache = ProcessedPageCache(cache_dir, "config")
+    cache.load()
+    assert cache.get("uses_snippet", "src1") == "processed 1"
+    assert cache.get("standalone", "src2") == "processed 2"
+    assert cache.dependents(str(snippet)) == {"uses_snippet"}
+
+    # Changed snippet: only the dependent page is re-processed
+    snippet.write_text("Version 2")
+    cache = ProcessedPageCache(cache_dir, "config")
+    cache.load()
+    assert cache.get("uses_snippet", "src1") is None
+    assert cache.get("standalone", "src2") == "processed 2"
+
+    # A different processor configuration discards the cache
+    cache = ProcessedPageCache(cache_dir, "other-config")
+    cache.load()
+    assert cache.get("standalone", "src2") is None
+
+
+def test_incremental_build_reuses_cache(temp_dir, rootdir):
+    """Test that a rebuild writes identical output using the persisted cache."""
+    import shutil
+    import sys
+    from pathlib import Path
+    from unittest import mock
+
+    from sphinx.testing.util import SphinxTestApp, _clean_up_global_state
+
+    src_dir = temp_dir / "src"
+    shutil.copytree(rootdir / "basic", src_dir)
+
+    def build():
+        app = SphinxTestApp(
+            srcdir=src_dir, builddir=temp_dir / "build", buildername="html"
+        )
+        try:
+            app.build()
+            assert (Path(app.doctreedir) / "llms-txt-cache.json").exists()
+            return (Path(app.outdir) / "test-llms-full.txt").read_text()
+        finally:
+            sys.path[:] = app._saved_path
+            _clean_up_global_state()
+
+    first = build()
+
+    # Every page comes from the cache, nothing is processed again
+    with mock.patch.object(
+        DocumentProcessor, "process_content", side_effect=AssertionError
+    ):
+        assert build() == first
+
+
+def test_new_image_changes_processor_config_hash(tmp_path):
+    """Test that images copied to _images invalidate the processed pages."""
+    from sphinx_llms_txt import LLMSFullManager
+
+    manager = LLMSFullManager()
+    manager.set_config({"llms_txt_directives": []})
+    manager.outdir = str(tmp_path)
+    manager.srcdir = str(tmp_path)
+    before = manager._get_processor_config_hash()
+
+    (tmp_path / "_images").mkdir()
+    (tmp_path / "_images" / "diagram.png").write_bytes(b"png")
+    assert manager._get_processor_config_hash() != before
+
+
+def test_scan_includes_matches_processing(tmp_path):
+    """Test that scanning finds the same includes that processing records."""
+    processor = DocumentProcessor({"llms_txt_directives": []})
+
+    (tmp_path / "snippet.rst").write_text("Shared snippet.")
+    source_file = tmp_path / "page.rst"
+    content = (
+        ".. include:: snippet.rst\n"
+        ".. include:: missing.rst\n"
+        "\n"
+        ".. code-block:: rst\n"
+        "\n"
+        "   .. include:: in_code_block.rst\n"
+    )
+
+    scanned = processor.scan_includes(content, source_file)
+    processor.process_content(content, source_file, "page")
+    assert scanned == processor.get_page_includes("page")
+
+
+def test_content_store_shared_between_checkouts(temp_dir, rootdir):
+    """Test that a fresh checkout at another path reuses the shared cache."""
+    import shutil
+    import sys
+    from pathlib import Path
+    from unittest import mock
+
+    from sphinx.testing.util import SphinxTestApp, _clean_up_global_state
+
+    cache_dir = temp_dir / "shared-cache"
+
+    def build(name):
+        src_dir = temp_dir / name / "src"
+        shutil.copytree(rootdir / "basic", src_dir)
+        app = SphinxTestApp(
+            srcdir=src_dir,
+            builddir=temp_dir / name / "build",
+            buildername="html",
+            freshenv=True,
+            confoverrides={"llms_txt_cache_dir": str(cache_dir)},
+        )
+        try:
+            app.build()
+            return (Path(app.outdir) / "test-llms-full.txt").read_text()
+        finally:
+            sys.path[:] = app._saved_path
+            _clean_up_global_state()
+
+    first = build("checkout1")
+    assert list(cache_dir.glob("*/*.txt"))
+
+    with mock.patch.object(
+        DocumentProcessor, "process_content", side_effect=AssertionError
+    ):
+        second = build("checkout2")
+    assert second == first
+
+
+def test_cache_saves_only_changes(tmp_path, monkeypatch):
+    """Test that pages are stored one file each and unchanged caches aren't saved."""
+    import os
+    import stat
+
+    from sphinx_llms_txt import writer
+
+    snippet = tmp_path / "snippet.rst"
+    snippet.write_text("Snippet")
+    includes = {str(snippet): hash_text("Snippet")}
+
+    umask = os.umask(0o022)
+    monkeypatch.setattr(writer, "_umask", None)
+    try:
+        cache = ProcessedPageCache(tmp_path, "config")
+        cache.put("a", "src-a", "processed a", includes)
+        cache.put("b", "src-b", "processed b", includes)
+        cache.save()
+    finally:
+        os.umask(umask)
+
+    index_path = tmp_path / "llms-txt-cache.json"
+    page_files = list((tmp_path / "llms-txt-pages").glob("*/*.txt"))
+    assert sorted(p.read_text() for p in page_files) == ["processed a", "processed b"]
+    assert "processed a" not in index_path.read_text()
+    assert stat.S_IMODE(index_path.stat().st_mode) == 0o644
+
+    # Reusing every page leaves the cache files alone
+    os.utime(index_path, (1, 1))
+    cache = ProcessedPageCache(tmp_path, "config")
+    cache.load()
+    assert cache.get("a", "src-a") == "processed a"
+    cache.put("a", "src-a", "processed a", includes)
+    cache.save(["a", "b"])
+    assert index_path.stat().st_mtime == 1
+
+    # A page that stops including a file only loses its own edge, and the
+    # content of removed pages is pruned
+    cache.put("a", "src-a2", "processed a2", {})
+    cache.save(["a"])
+    assert cache.dependents(str(snippet)) == set()
+    assert cache.page_includes == {"a": set()}
+    page_files = list((tmp_path / "llms-txt-pages").glob("*/*.txt"))
+    assert [p.read_text() for p in page_files] == ["processed a2"]
@@ -187,6 +187,41 @@ def test_on_exceed_keep(temp_dir, rootdir):
         app.docutils_conf_path.unlink()
 
 
+def test_on_exceed_pack(temp_dir, rootdir):
+    """Test that pack action keeps the highest priority pages that fit."""
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    app = SphinxTestApp(
+        srcdir=src_dir,
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={
+            "llms_txt_full_filename": "pack-test.txt",
+            "llms_txt_full_max_size": 40,
+            "llms_txt_full_size_policy": "info_pack",
+            "llms_txt_full_priorities": {"page2": 10, "index": -10},
+        },
+    )
+
+    app.build()
+
+    content = (Path(app.outdir) / "pack-test.txt").read_text()
+    assert content.count("\n") + 1 <= 40
+    assert "Page 2 Title" in content
+    assert "Welcome to Test Project" not in content
+    # The picked pages keep their toctree order
+    assert content.index("Page 1 Title") < content.index("Page 2 Title")
+
+    # Cleanup
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
+
+
 def test_on_exceed_note(temp_dir, rootdir):
     """Test that note action works when size limit is exceeded."""
     from sphinx.testing.util import SphinxTestApp
@@ -378,3 +413,291 @@ def test_exclusion(temp_dir, rootdir):
     # Safe unlink
     if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
         app.docutils_conf_path.unlink()
+
+
+def test_page_descriptions(temp_dir, rootdir):
+    """Test that page descriptions are captured and survive incremental builds."""
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    def build(freshenv):
+        app = SphinxTestApp(
+            srcdir=src_dir,
+            builddir=temp_dir,
+            buildername="html",
+            freshenv=freshenv,
+            confoverrides={"llms_txt_page_descriptions": True},
+        )
+        try:
+            app.build()
+            return Path(app.outdir) / "llms.txt"
+        finally:
+            # Custom cleanup to avoid missing_ok issue
+            sys.path[:] = app._saved_path
+            _clean_up_global_state()
+
+            # Safe unlink
+            if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+                app.docutils_conf_path.unlink()
+
+    llms_txt = build(freshenv=True)
+    content = llms_txt.read_text()
+    assert "page_with_include.rst.txt): This is a test page that includes" in content
+    assert "\n> " in content
+    mtime = llms_txt.stat().st_mtime_ns
+
+    # A new build with nothing rewritten restores descriptions and the summary
+    # from disk, leaving llms.txt untouched
+    llms_txt = build(freshenv=False)
+    assert llms_txt.read_text() == content
+    assert llms_txt.stat().st_mtime_ns == mtime
+
+
+def test_sharded_full_file(temp_dir, rootdir):
+    """Test that a build writes llms-full.txt shards and their manifest."""
+    import json
+
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    app = SphinxTestApp(
+        srcdir=src_dir,
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={
+            "llms_txt_full_shard_size": 1,
+            "llms_txt_full_shard_unit": "lines",
+        },
+    )
+
+    app.build()
+    outdir = Path(app.outdir)
+    manifest = json.loads((outdir / "test-llms-full.manifest.json").read_text())
+
+    # Every shard holds a single page since each page exceeds the limit
+    docnames = [d for shard in manifest["shards"] for d in shard["docnames"]]
+    assert docnames[0] == "index"
+    assert "page_with_include" in docnames
+    assert all(len(shard["docnames"]) <= 1 for shard in manifest["shards"])
+
+    combined = "\n".join(
+        (outdir / shard["file"]).read_text() for shard in manifest["shards"]
+    )
+    assert combined == (outdir / "test-llms-full.txt").read_text()
+
+    # Custom cleanup to avoid missing_ok issue
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+
+    # Safe unlink
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
+
+
+def test_link_hashes_match_full_file(temp_dir, rootdir):
+    """Test that llms.txt link hashes match the pages in llms-full.txt."""
+    import hashlib
+    import json
+    import re
+
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    app = SphinxTestApp(
+        srcdir=src_dir,
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={"llms_txt_link_hashes": True, "llms_txt_full_index": True},
+    )
+
+    app.build()
+    outdir = Path(app.outdir)
+    llms_txt = (outdir / "llms.txt").read_text()
+    full = (outdir / "test-llms-full.txt").read_bytes()
+    index = json.loads((outdir / "test-llms-full.index.json").read_text())
+
+    stats = dict(
+        re.findall(
+            r"_sources/(\S+?)\.rst\.txt\): \(sha256:([0-9a-f]+), \d+ bytes\)", llms_txt
+        )
+    )
+    assert "index" in stats and "page_with_include" in stats
+    for docname, short_hash in stats.items():
+        page = index["pages"][docname]
+        page_bytes = full[page["start"] : page["end"]]
+        assert hashlib.sha256(page_bytes).hexdigest().startswith(short_hash)
+        assert f"{short_hash}, {len(page_bytes)} bytes" in llms_txt
+
+    # Custom cleanup to avoid missing_ok issue
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+
+    # Safe unlink
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
+
+
+def test_section_files(temp_dir, rootdir):
+    """Test writing one llms-full file per top-level toctree section."""
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    app = SphinxTestApp(
+        srcdir=src_dir,
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={"llms_txt_full_sections": True},
+    )
+
+    app.build()
+    outdir = Path(app.outdir)
+    section_dir = outdir / "test-llms-full"
+    # Pages ignored through metadata don't get a section file
+    assert sorted(p.name for p in section_dir.iterdir()) == [
+        "page1.txt",
+        "page2.txt",
+        "page_with_ignore_blocks.txt",
+        "page_with_include.txt",
+    ]
+    page1 = (section_dir / "page1.txt").read_text()
+    assert "Page 1 Title" in page1
+    assert "Page 2 Title" not in page1
+
+    llms_txt = (outdir / "llms.txt").read_text()
+    sections = llms_txt.split("## Sections\n\n")[1].split("## Docs")[0]
+    assert sections.startswith("- [Page 1 Title](/test-llms-full/page1.txt)\n")
+
+    # Custom cleanup to avoid missing_ok issue
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+
+    # Safe unlink
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
+
+
+def test_section_files_size_policy_and_cleanup(temp_dir, rootdir):
+    """Test that section files ignore the size policy and are cleaned up."""
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    def build(confoverrides):
+        app = SphinxTestApp(
+            srcdir=src_dir,
+            builddir=temp_dir,
+            buildername="html",
+            freshenv=True,
+            confoverrides=confoverrides,
+        )
+        try:
+            app.build()
+        finally:
+            sys.path[:] = app._saved_path
+            _clean_up_global_state()
+            if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+                app.docutils_conf_path.unlink()
+        return Path(app.outdir)
+
+    outdir = build(
+        {
+            "llms_txt_full_sections": True,
+            "llms_txt_full_max_size": 1,
+            "llms_txt_full_size_policy": "info_skip",
+        }
+    )
+    section_dir = outdir / "test-llms-full"
+    # llms-full.txt is skipped, but the sections are complete and linked
+    assert not (outdir / "test-llms-full.txt").exists()
+    assert "Page 1 Title" in (section_dir / "page1.txt").read_text()
+    llms_txt = (outdir / "llms.txt").read_text()
+    assert "- [Page 1 Title](/test-llms-full/page1.txt)" in llms_txt
+
+    # Turning the option off removes only the files the extension wrote
+    (section_dir / "notes.txt").write_text("Not written by sphinx-llms-txt")
+    outdir = build({})
+    assert [p.name for p in section_dir.iterdir()] == ["notes.txt"]
+
+
+def test_nested_index(temp_dir, rootdir):
+    """Test writing llms.txt as nested indexes."""
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    app = SphinxTestApp(
+        srcdir=src_dir,
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={"llms_txt_index_depth": 1},
+    )
+
+    app.build()
+    outdir = Path(app.outdir)
+    index_dir = outdir / "llms"
+    assert sorted(p.name for p in index_dir.iterdir()) == [
+        "page1.txt",
+        "page2.txt",
+        "page_with_ignore_blocks.txt",
+        "page_with_include.txt",
+    ]
+    assert "Page 1 Title" in (index_dir / "page1.txt").read_text()
+
+    llms_txt = (outdir / "llms.txt").read_text()
+    indexes = llms_txt.split("## Indexes\n\n")[1].split("## Docs")[0]
+    assert indexes.startswith("- [Page 1 Title](/llms/page1.txt)\n")
+    assert "_sources/index.rst.txt" in llms_txt.split("## Docs")[1]
+
+    # Custom cleanup to avoid missing_ok issue
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+
+    # Safe unlink
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
+
+
+def test_tiered_output(temp_dir, rootdir):
+    """Test writing token-budget tiers of llms-full.txt in the same build."""
+    from sphinx.testing.util import SphinxTestApp
+
+    src_dir = rootdir / "basic"
+
+    app = SphinxTestApp(
+        srcdir=src_dir,
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={
+            "llms_txt_full_tiers": {"llms-small.txt": 100, "llms-all.txt": None},
+            # The tiers are still written when llms-full.txt is skipped
+            "llms_txt_full_max_size": 1,
+        },
+    )
+
+    app.build()
+    outdir = Path(app.outdir)
+    assert not (outdir / "test-llms-full.txt").exists()
+
+    small = (outdir / "llms-small.txt").read_text()
+    assert "Welcome to Test Project" in small
+    assert len(small) <= 400
+    all_pages = (outdir / "llms-all.txt").read_text()
+    assert small != all_pages
+    assert all_pages.index("Page 1 Title") < all_pages.index("Page 2 Title")
+
+    # Custom cleanup to avoid missing_ok issue
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+
+    # Safe unlink
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
@@ -1,5 +1,7 @@
 """Test the sphinx_llms_txt extension."""
 
+import hashlib
+
 from sphinx_llms_txt import (
     DocumentCollector,
     DocumentProcessor,
@@ -817,18 +819,37 @@ def test_summary_default_uses_first_paragraph():
         class Config:
             master_doc = "index"
             llms_txt_summary = None  # Not configured
+            llms_txt_page_descriptions = False
+            llms_txt_link_hashes = False
             llms_txt_file = True
             llms_txt_filename = "llms.txt"
             llms_txt_uri_template = None
+            llms_txt_uri_variants = []
             llms_txt_title = None
             llms_txt_full_file = True
             llms_txt_full_filename = "llms-full.txt"
             llms_txt_full_max_size = None
             llms_txt_full_size_policy = "warn_skip"
+            llms_txt_full_compress = []
+            llms_txt_full_compress_level = None
+            llms_txt_full_index = False
+            llms_txt_full_sections = False
+            llms_txt_full_priorities = {}
+            llms_txt_full_tiers = {}
+            llms_txt_index_depth = None
+            llms_txt_index_max_entries = None
+            llms_txt_full_delta = False
+            llms_txt_full_shard_size = None
+            llms_txt_full_shard_unit = "bytes"
+            llms_txt_full_shard_boundary = "size"
             llms_txt_directives = []
             llms_txt_exclude = []
+            llms_txt_exclude_toctree = []
+            llms_txt_exclude_metadata = {}
             llms_txt_code_files = []
             llms_txt_code_base_path = None
+            llms_txt_cache_dir = None
+            llms_txt_snapshot = False
             html_baseurl = ""
 
         config = Config()
@@ -1182,3 +1203,876 @@ def test_llms_txt_no_warning_when_full_file_disabled(tmp_path, caplog):
     # Verify llms.txt was still created
     llms_txt = outdir / "llms.txt"
     assert llms_txt.exists()
+
+
+def test_page_order_follows_toctree_depth_first():
+    """Test that page order is a depth-first walk with remaining docs sorted."""
+
+    class MockEnv:
+        all_docs = {
+            "index": None,
+            "a": None,
+            "a1": None,
+            "b": None,
+            "orphan_z": None,
+            "orphan_y": None,
+        }
+        titles = {}
+        toctree_includes = {"index": ["a", "b"], "a": ["a1", "b"], "b": ["a"]}
+
+    collector = DocumentCollector()
+    collector.set_env(MockEnv())
+    collector.set_master_doc("index")
+
+    assert [docname for docname, _ in collector.get_page_order()] == [
+        "index",
+        "a",
+        "a1",
+        "b",
+        "orphan_y",
+        "orphan_z",
+    ]
+
+
+def test_page_order_deep_toctree():
+    """Test that very deep toctrees don't hit the recursion limit."""
+    import sys
+
+    depth = sys.getrecursionlimit() * 2
+    docnames = ["index"] + [f"doc{i}" for i in range(depth)]
+
+    class MockEnv:
+        all_docs = dict.fromkeys(docnames)
+        titles = {}
+        toctree_includes = {
+            parent: [child] for parent, child in zip(docnames, docnames[1:])
+        }
+
+    collector = DocumentCollector()
+    collector.set_env(MockEnv())
+    collector.set_master_doc("index")
+
+    assert [docname for docname, _ in collector.get_page_order()] == docnames
+
+
+def test_page_order_suffix_from_env_doc2path(tmp_path):
+    """Test that source suffixes come from env.doc2path without probing files."""
+    sources_dir = tmp_path / "_sources"
+    sources_dir.mkdir()
+
+    class MockApp:
+        class Config:
+            source_suffix = {".rst": None, ".md": None}
+            html_sourcelink_suffix = ".txt"
+
+        config = Config()
+
+    class MockEnv:
+        all_docs = {"index": None, "guide": None}
+        titles = {}
+        toctree_includes = {"index": ["guide"]}
+
+        def doc2path(self, docname, base=True):
+            return {"index": "index.rst", "guide": "guide.md"}[docname]
+
+    collector = DocumentCollector()
+    collector.set_app(MockApp())
+    collector.set_env(MockEnv())
+    collector.set_master_doc("index")
+
+    # No files exist in _sources, so the suffixes can only come from the env
+    assert collector.get_page_order(sources_dir) == [
+        ("index", ".rst"),
+        ("guide", ".md"),
+    ]
+
+
+def test_page_order_directory_fallback():
+    """Test that documents without toctrees pull in their directory siblings."""
+
+    class MockEnv:
+        all_docs = {
+            "index": None,
+            "guide/intro": None,
+            "api/b": None,
+            "api_extra/x": None,
+            "api/nested/c": None,
+            "api/a": None,
+        }
+        titles = {}
+        toctree_includes = {"index": ["api/a", "guide/intro"]}
+
+    collector = DocumentCollector()
+    collector.set_env(MockEnv())
+    collector.set_master_doc("index")
+
+    # Siblings (including nested ones) follow in sorted order. Documents in
+    # directories that merely share a name prefix are not siblings.
+    assert [docname for docname, _ in collector.get_page_order()] == [
+        "index",
+        "api/a",
+        "api/b",
+        "api/nested/c",
+        "guide/intro",
+        "api_extra/x",
+    ]
+
+
+def test_page_order_directory_fallback_revisits_directory():
+    """Test that expanding a directory again keeps the startswith order."""
+
+    class MockEnv:
+        all_docs = dict.fromkeys(
+            ["index", "api/a", "api/b", "api/c", "api/d", "m", "n", "other/x"]
+        )
+        titles = {}
+        toctree_includes = {
+            "index": ["api/a", "other/x"],
+            "api/b": ["m"],
+            "m": ["api/d", "n"],
+        }
+
+    collector = DocumentCollector()
+    collector.set_env(MockEnv())
+    collector.set_master_doc("index")
+
+    # api/d expands "api" again, so its unvisited sibling api/c comes before
+    # n, as when every docname was scanned with startswith()
+    assert [docname for docname, _ in collector.get_page_order()] == [
+        "index",
+        "api/a",
+        "api/b",
+        "m",
+        "api/d",
+        "api/c",
+        "n",
+        "other/x",
+    ]
+
+
+def test_docname_trie_docs_under():
+    """Test enumerating documents below a directory prefix."""
+    from sphinx_llms_txt.collector import DocnameTrie
+
+    trie = DocnameTrie(["index", "a/one", "a/b/two", "ab/three", "a/four"])
+    assert trie.docs_under("a") == ["a/one", "a/b/two", "a/four"]
+    assert trie.docs_under("a/b") == ["a/b/two"]
+    assert trie.docs_under("missing") == []
+
+
+def test_page_order_cached_by_fingerprint(tmp_path):
+    """Test that page order is reused until the toctree structure changes."""
+
+    class MockApp:
+        doctreedir = str(tmp_path / "doctrees")
+
+        class Config:
+            source_suffix = ".rst"
+            html_sourcelink_suffix = ".txt"
+
+        config = Config()
+
+    class MockEnv:
+        all_docs = {"index": None, "a": None, "b": None}
+        titles = {}
+        toctree_includes = {"index": ["b", "a"]}
+
+    env = MockEnv()
+    collector = DocumentCollector()
+    collector.set_app(MockApp())
+    collector.set_env(env)
+    collector.set_master_doc("index")
+
+    expected = [("index", None), ("b", None), ("a", None)]
+    assert collector.get_page_order() == expected
+    assert (tmp_path / "doctrees" / "llms-txt-page-order.json").exists()
+
+    # Unchanged structure: the traversal is skipped entirely
+    collector._compute_page_order = None
+    assert collector.get_page_order() == expected
+
+    # Changed structure: the order is recomputed
+    del collector._compute_page_order
+    env.toctree_includes = {"index": ["a", "b"]}
+    assert collector.get_page_order() == [("index", None), ("a", None), ("b", None)]
+
+
+def test_doctree_resolved_skips_non_root_traversal():
+    """Test that only the root document's doctree is walked."""
+    from sphinx_llms_txt import doctree_resolved
+
+    class UnwalkableDoctree:
+        def findall(self, *args, **kwargs):
+            raise AssertionError("doctree should not be traversed")
+
+        traverse = findall
+
+    class MockApp:
+        class Config:
+            master_doc = "index"
+            llms_txt_page_descriptions = False
+
+        config = Config()
+
+        class Env:
+            metadata = {}
+
+        env = Env()
+
+    # Non-root documents are not traversed; titles come from env.titles later
+    doctree_resolved(MockApp(), UnwalkableDoctree(), "page1")
+
+
+def test_write_verbose_info_with_page_descriptions(tmp_path):
+    """Test that page descriptions are appended to llms.txt links."""
+    config = {"llms_txt_filename": "llms.txt"}
+    writer = FileWriter(config, str(tmp_path))
+
+    writer.write_verbose_info_to_file(
+        [("index", None), ("about", None)],
+        {"index": "Home Page", "about": "About Us"},
+        page_descriptions={"about": "Who we are."},
+    )
+
+    content = (tmp_path / "llms.txt").read_text()
+    assert "- [Home Page](/index.html)\n" in content
+    assert "- [About Us](/about.html): Who we are.\n" in content
+
+
+def test_restore_page_descriptions(tmp_path):
+    """Test that only pages not resolved this build get cached descriptions."""
+    import json
+
+    class MockEnv:
+        all_docs = {"kept": 0, "rewritten": 0, "updated": 0}
+
+    class MockApp:
+        doctreedir = str(tmp_path)
+
+    cache_path = tmp_path / "llms-txt-descriptions.json"
+    cache_path.write_text(
+        json.dumps(
+            {"kept": "Kept.", "rewritten": "Old.", "updated": "Old.", "gone": "Gone."}
+        )
+    )
+
+    manager = LLMSFullManager()
+    manager.set_env(MockEnv())
+    manager.set_app(MockApp())
+    # "rewritten" was resolved this build and no longer has a description
+    manager.mark_page_resolved("rewritten")
+    manager.mark_page_resolved("updated")
+    manager.update_page_description("updated", "New.")
+    manager._restore_page_descriptions()
+
+    expected = {"kept": "Kept.", "updated": "New."}
+    assert manager.collector.page_descriptions == expected
+    assert json.loads(cache_path.read_text()) == expected
+
+
+def test_write_verbose_info_with_page_stats(tmp_path):
+    """Test that content hashes and sizes are appended to llms.txt links."""
+    config = {"llms_txt_filename": "llms.txt"}
+    writer = FileWriter(config, str(tmp_path))
+
+    writer.write_verbose_info_to_file(
+        [("index", None), ("about", None), ("new", None)],
+        {"index": "Home Page", "about": "About Us", "new": "New"},
+        page_descriptions={"about": "Who we are."},
+        page_stats={"index": ("0123456789abcdef", 42), "about": ("fedcba", 7)},
+    )
+
+    content = (tmp_path / "llms.txt").read_text()
+    assert "- [Home Page](/index.html): (sha256:0123456789abcdef, 42 bytes)\n" in (
+        content
+    )
+    assert "- [About Us](/about.html): Who we are. (sha256:fedcba, 7 bytes)\n" in (
+        content
+    )
+    assert "- [New](/new.html)\n" in content
+
+
+def test_filter_excluded_toctree_subtree():
+    """Test excluding every document below a toctree root."""
+
+    class MockEnv:
+        all_docs = {}
+        titles = {}
+        toctree_includes = {
+            "index": ["guide", "api/index"],
+            "api/index": ["api/a", "api/b"],
+            "api/b": ["api/b_detail"],
+        }
+
+    collector = DocumentCollector()
+    collector.set_env(MockEnv())
+    collector.set_config(
+        {"llms_txt_exclude": ["guide*"], "llms_txt_exclude_toctree": ["api/index"]}
+    )
+
+    page_order = [
+        ("index", ".rst"),
+        ("guide", ".rst"),
+        ("api/index", ".rst"),
+        ("api/a", ".rst"),
+        ("api/b", ".rst"),
+        ("api/b_detail", ".rst"),
+        ("other", ".rst"),
+    ]
+    assert collector.filter_excluded_pages(page_order) == [
+        ("index", ".rst"),
+        ("other", ".rst"),
+    ]
+    assert collector.is_excluded("api/b_detail")
+    assert not collector.is_excluded("other")
+
+
+def test_metadata_filters():
+    """Test excluding pages by arbitrary metadata fields."""
+
+    class MockEnv:
+        metadata = {
+            "index": {},
+            "orphaned": {"orphan": ""},
+            "internal": {"audience": "Internal"},
+            "public": {"audience": "public"},
+            "old": {"status": "deprecated"},
+            "hidden": {"llms-txt-ignore": "true"},
+        }
+
+    manager = LLMSFullManager()
+    manager.set_env(MockEnv())
+    manager.set_config(
+        {
+            "llms_txt_exclude_metadata": {
+                "orphan": True,
+                "audience": "internal",
+                "status": ["deprecated", "obsolete"],
+            }
+        }
+    )
+    manager.apply_metadata_filters()
+
+    page_order = [(docname, ".rst") for docname in MockEnv.metadata]
+    assert manager.collector.filter_excluded_pages(page_order) == [
+        ("index", ".rst"),
+        ("public", ".rst"),
+        ("hidden", ".rst"),
+    ]
+    assert manager.ignored_pages == {"hidden"}
+
+
+def test_write_combined_file_precompressed(tmp_path, monkeypatch):
+    """Test that compressed siblings match the combined file."""
+    import gzip
+    import sys
+
+    # Simulate brotli not being installed
+    monkeypatch.setitem(sys.modules, "brotli", None)
+
+    writer = FileWriter(
+        {"llms_txt_full_compress": ["gz", "br"], "llms_txt_full_compress_level": 6},
+        str(tmp_path),
+    )
+    output_path = tmp_path / "llms-full.txt"
+    content_parts = ["Page one\n", "Page two ü\n", "Page three"]
+
+    assert writer.write_combined_file(content_parts, output_path, 5)
+
+    content = output_path.read_text(encoding="utf-8")
+    assert content == "\n".join(content_parts)
+    with gzip.open(tmp_path / "llms-full.txt.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == content
+    # Formats without an installed compressor are skipped
+    assert not (tmp_path / "llms-full.txt.br").exists()
+
+
+def test_write_combined_file_invalid_compress_level(tmp_path):
+    """Test that an invalid compression level falls back to the default."""
+    import gzip
+
+    content_parts = ["Page one\n", "Page two"]
+    for level in (20, "9", True):
+        writer = FileWriter(
+            {"llms_txt_full_compress": ["gz"], "llms_txt_full_compress_level": level},
+            str(tmp_path),
+        )
+        output_path = tmp_path / "llms-full.txt"
+        assert writer.write_combined_file(content_parts, output_path, 2)
+        assert output_path.read_text() == "Page one\n\nPage two"
+        with gzip.open(tmp_path / "llms-full.txt.gz", "rt") as f:
+            assert f.read() == "Page one\n\nPage two"
+
+
+def test_write_combined_file_invalid_shard_size(tmp_path):
+    """Test that an invalid shard size disables sharding, not the write."""
+    for max_size in ("100", -1, 0, True):
+        writer = FileWriter({"llms_txt_full_shard_size": max_size}, str(tmp_path))
+        output_path = tmp_path / "llms-full.txt"
+        assert writer.write_combined_file(["Page one", "Page two"], output_path, 2)
+        assert output_path.read_text() == "Page one\nPage two"
+        assert not list(tmp_path.glob("llms-full-*.txt"))
+        assert not (tmp_path / "llms-full.manifest.json").exists()
+
+
+def test_atomic_output_file_skips_unchanged(tmp_path):
+    """Test that rewriting identical content leaves the output file untouched."""
+    import os
+
+    from sphinx_llms_txt.writer import AtomicOutputFile
+
+    output_path = tmp_path / "llms.txt"
+    with AtomicOutputFile(output_path) as f:
+        f.write("# Title\n")
+        f.write("- [Page](page.html)\n")
+    assert f.changed
+    assert output_path.read_bytes() == b"# Title\n- [Page](page.html)\n"
+
+    os.utime(output_path, (1, 1))
+    before = os.stat(output_path)
+
+    with AtomicOutputFile(output_path) as f:
+        f.write("# Title\n- [Page](page.html)\n")
+    assert f.changed is False
+    after = os.stat(output_path)
+    assert (after.st_ino, after.st_mtime) == (before.st_ino, before.st_mtime)
+
+    with AtomicOutputFile(output_path) as f:
+        f.write("# New title\n")
+    assert f.changed
+    assert output_path.read_text() == "# New title\n"
+    assert os.stat(output_path).st_mtime != before.st_mtime
+
+    # A failed write leaves the previous file and no temporary files behind
+    try:
+        with AtomicOutputFile(output_path) as f:
+            f.write("partial")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert output_path.read_text() == "# New title\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["llms.txt"]
+
+
+def test_atomic_output_file_threads_keep_umask(tmp_path, monkeypatch):
+    """Test that writing from worker threads doesn't disturb the umask."""
+    import os
+    import stat
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sphinx_llms_txt import writer
+    from sphinx_llms_txt.writer import AtomicOutputFile
+
+    umask = os.umask(0o022)
+    # Read the umask set here rather than a cached one
+    monkeypatch.setattr(writer, "_umask", None)
+    try:
+
+        def write(number):
+            path = tmp_path / f"section-{number}.txt"
+            with AtomicOutputFile(path) as f:
+                f.write(f"Section {number}\n")
+            return stat.S_IMODE(os.stat(path).st_mode)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            modes = set(executor.map(write, range(200)))
+        assert modes == {0o644}
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(umask)
+
+
+def test_write_combined_file_shards(tmp_path):
+    """Test that shards split at page boundaries and are listed in a manifest."""
+    import json
+
+    writer = FileWriter(
+        {"llms_txt_full_shard_size": 25, "llms_txt_full_shard_unit": "bytes"},
+        str(tmp_path),
+    )
+    output_path = tmp_path / "llms-full.txt"
+    content_parts = ["Page one\n", "Page two\n", "A very long page three\n", "Code\n"]
+    docnames = ["one", "two", "three", None]
+
+    # A shard left over from a previous build with more shards
+    (tmp_path / "llms-full-009.txt").write_text("stale")
+
+    assert writer.write_combined_file(content_parts, output_path, 4, docnames)
+
+    assert (tmp_path / "llms-full-001.txt").read_text() == "Page one\n\nPage two\n"
+    assert (tmp_path / "llms-full-002.txt").read_text() == "A very long page three\n"
+    assert (tmp_path / "llms-full-003.txt").read_text() == "Code\n"
+    assert not (tmp_path / "llms-full-009.txt").exists()
+    # The combined file is still written
+    assert output_path.read_text() == "\n".join(content_parts)
+
+    manifest = json.loads((tmp_path / "llms-full.manifest.json").read_text())
+    assert manifest["source"] == "llms-full.txt"
+    assert manifest["unit"] == "bytes"
+    shards = manifest["shards"]
+    assert [s["file"] for s in shards] == [
+        "llms-full-001.txt",
+        "llms-full-002.txt",
+        "llms-full-003.txt",
+    ]
+    assert [s["docnames"] for s in shards] == [["one", "two"], ["three"], []]
+    for shard in shards:
+        data = (tmp_path / shard["file"]).read_bytes()
+        assert shard["bytes"] == len(data)
+        assert shard["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_measure_text_units():
+    """Test measuring text in bytes, lines and estimated tokens."""
+    from sphinx_llms_txt.writer import measure_text
+
+    assert measure_text("ü\nab\n", "bytes") == 6
+    assert measure_text("ü\nab\n", "lines") == 2
+    assert measure_text("abcdefghi", "tokens") == 3
+
+
+def test_content_defined_shards_are_stable(tmp_path):
+    """Test that editing one page only changes the shards around it."""
+    import json
+
+    def shard_hashes(boundary, pages):
+        outdir = tmp_path / boundary
+        outdir.mkdir(exist_ok=True)
+        writer = FileWriter(
+            {
+                "llms_txt_full_shard_size": 4000,
+                "llms_txt_full_shard_boundary": boundary,
+            },
+            str(outdir),
+        )
+        writer.write_combined_file(pages, outdir / "llms-full.txt", 0)
+        manifest = json.loads((outdir / "llms-full.manifest.json").read_text())
+        assert manifest["boundary"] == boundary
+        assert all(s["bytes"] <= 4000 for s in manifest["shards"])
+        return [s["sha256"] for s in manifest["shards"]]
+
+    pages = [f"Page {i}\n" + "text " * (20 + i % 37) + "\n" for i in range(300)]
+    edited = list(pages)
+    edited[5] = edited[5] + "An extra paragraph added to an early page. " * 20
+
+    for boundary in ("size", "content"):
+        before = shard_hashes(boundary, pages)
+        after = shard_hashes(boundary, edited)
+        changed = len(set(after) - set(before))
+        if boundary == "size":
+            assert changed > 5
+        else:
+            assert 1 <= changed <= 2
+
+
+def test_write_combined_file_index(tmp_path):
+    """Test that the index maps pages and sections to byte ranges."""
+    import json
+
+    writer = FileWriter({"llms_txt_full_index": True}, str(tmp_path))
+    output_path = tmp_path / "llms-full.txt"
+    content_parts = [
+        "Intro ü\n=======\n\nWelcome.\n",
+        "Guide\n=====\n\nUsage\n-----\n\nRun it.\n\nAPI\n---\n\nCall it.\n",
+        "Code\n",
+    ]
+
+    assert writer.write_combined_file(
+        content_parts, output_path, 0, ["intro", "guide", None]
+    )
+
+    data = output_path.read_bytes()
+    index = json.loads((tmp_path / "llms-full.index.json").read_text())
+    assert index["source"] == "llms-full.txt"
+    assert list(index["pages"]) == ["intro", "guide"]
+
+    for docname, part in zip(["intro", "guide"], content_parts):
+        page = index["pages"][docname]
+        assert data[page["start"] : page["end"]].decode("utf-8") == part
+
+    sections = index["pages"]["guide"]["sections"]
+    assert [(s["title"], s["level"]) for s in sections] == [
+        ("Guide", 1),
+        ("Usage", 2),
+        ("API", 2),
+    ]
+    usage = sections[1]
+    assert data[usage["start"] : usage["end"]] == b"Usage\n-----\n\nRun it.\n\n"
+    assert sections[2]["end"] == index["pages"]["guide"]["end"]
+
+
+def test_find_section_headings():
+    """Test detecting reStructuredText and Markdown headings."""
+    from sphinx_llms_txt.writer import find_section_headings
+
+    content = (
+        "=====\nTitle\n=====\n\n"
+        "Text directly above\n-------------------\n\n"
+        "Sub\n---\n\n"
+        "```\n# comment in a code fence\n```\n"
+        "## Markdown ##\n"
+    )
+    headings = find_section_headings(content)
+    assert [(title, level) for title, level, _ in headings] == [
+        ("Title", 1),
+        ("Text directly above", 2),
+        ("Sub", 2),
+        ("Markdown", 2),
+    ]
+    assert headings[0][2] == 0
+    assert content.encode()[headings[2][2] :].startswith(b"Sub\n")
+
+
+def test_find_section_headings_short_underlines():
+    """Test that underlines shorter than the title count, as in docutils."""
+    from pathlib import Path
+
+    from sphinx_llms_txt.writer import find_section_headings
+
+    roots = Path(__file__).parent / "roots" / "basic"
+    for page, title in (
+        ("index", "Welcome to Test Project's documentation!"),
+        ("page1", "Page 1 Title"),
+        ("page2", "Page 2 Title"),
+    ):
+        content = (roots / f"{page}.rst").read_text()
+        assert find_section_headings(content)[0] == (title, 1, 0)
+
+    # Underlines of fewer than 4 characters must cover the title
+    assert find_section_headings("Long title\n---\n\nText\n") == []
+
+
+def test_write_combined_file_delta(tmp_path):
+    """Test that the delta lists pages changed since the previous build."""
+    import json
+
+    writer = FileWriter({"llms_txt_full_delta": True}, str(tmp_path))
+    output_path = tmp_path / "llms-full.txt"
+    delta_path = tmp_path / "llms-full.delta.json"
+
+    writer.write_combined_file(["A\n", "B\n", "C\n"], output_path, 3, ["a", "b", "c"])
+    delta = json.loads(delta_path.read_text())
+    assert delta["previous_sha256"] is None
+    assert delta["added"] == {"a": "A\n", "b": "B\n", "c": "C\n"}
+    first_hash = delta["sha256"]
+    assert first_hash == hashlib.sha256(output_path.read_bytes()).hexdigest()
+
+    pages = dict(delta["added"])
+
+    def apply(delta):
+        pages.update(delta["added"])
+        pages.update(delta["changed"])
+        for docname in delta["removed"]:
+            del pages[docname]
+        content = "\n".join(pages[docname] for docname in delta["order"])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    writer.write_combined_file(
+        ["A\n", "B changed\n", "D\n", "Files\n", "Code\n"],
+        output_path,
+        5,
+        ["a", "b", "d", None, None],
+    )
+    delta = json.loads(delta_path.read_text())
+    assert delta["previous_sha256"] == first_hash
+    assert delta["added"] == {"d": "D\n", ":code-files": "Files\n\nCode\n"}
+    assert delta["changed"] == {"b": "B changed\n"}
+    assert delta["removed"] == ["c"]
+    assert delta["order"] == ["a", "b", "d", ":code-files"]
+    assert apply(delta) == delta["sha256"]
+
+    # Changed code files show up like a changed page
+    writer.write_combined_file(
+        ["A\n", "B changed\n", "D\n", "Files\n", "New code\n"],
+        output_path,
+        5,
+        ["a", "b", "d", None, None],
+    )
+    delta = json.loads(delta_path.read_text())
+    assert delta["changed"] == {":code-files": "Files\n\nNew code\n"}
+    assert apply(delta) == delta["sha256"]
+    assert delta["sha256"] == hashlib.sha256(output_path.read_bytes()).hexdigest()
+
+
+def test_get_toctree_sections():
+    """Test splitting the toctree into top-level sections."""
+
+    class MockEnv:
+        all_docs = {}
+        titles = {}
+        metadata = {}
+        toctree_includes = {
+            "index": ["guide", "api/index", "private"],
+            "api/index": ["api/a", "api/b"],
+            "api/b": ["api/b_detail"],
+        }
+
+    collector = DocumentCollector()
+    collector.set_master_doc("index")
+    collector.set_env(MockEnv())
+    collector.set_config({"llms_txt_exclude": ["private"]})
+
+    assert collector.get_toctree_sections() == [
+        ("guide", {"guide"}),
+        ("api/index", {"api/index", "api/a", "api/b", "api/b_detail"}),
+    ]
+
+    manager = LLMSFullManager()
+    used_names = set()
+    assert manager._get_section_filename("api/index", used_names) == "api"
+    assert manager._get_section_filename("guides/setup", used_names) == "guides-setup"
+    assert manager._get_section_filename("api", used_names) == "api-2"
+
+
+def test_nested_index(tmp_path):
+    """Test splitting llms.txt into nested indexes following the toctree."""
+
+    class MockEnv:
+        all_docs = {}
+        titles = {}
+        metadata = {}
+        toctree_includes = {
+            "index": ["guide", "api/index"],
+            "api/index": ["api/a", "api/b"],
+            "api/b": ["api/b_detail"],
+        }
+
+    manager = LLMSFullManager()
+    manager.set_master_doc("index")
+    manager.set_env(MockEnv())
+    manager.set_config({"llms_txt_exclude": []})
+
+    page_order = [
+        ("index", ".rst"),
+        ("guide", ".rst"),
+        ("api/index", ".rst"),
+        ("api/a", ".rst"),
+        ("api/b", ".rst"),
+        ("api/b_detail", ".rst"),
+    ]
+    tree = manager._build_index_tree(page_order, 2)
+    assert tree["name"] == "index"
+    assert tree["pages"] == [("index", ".rst")]
+    assert [child["name"] for child in tree["sections"]] == ["guide", "api"]
+    api = tree["sections"][1]
+    assert api["pages"] == [("api/index", ".rst")]
+    assert [child["docname"] for child in api["sections"]] == ["api/a", "api/b"]
+    assert api["sections"][1]["pages"] == [("api/b", ".rst"), ("api/b_detail", ".rst")]
+    assert api["sections"][1]["sections"] == []
+
+    # A depth of 1 keeps the whole subtree in the top-level index
+    tree = manager._build_index_tree(page_order, 1)
+    assert len(tree["sections"][1]["pages"]) == 4
+    assert tree["sections"][1]["sections"] == []
+
+    class MockApp:
+        class Config:
+            pass
+
+        config = Config()
+        doctreedir = str(tmp_path / "doctrees")
+
+    writer = FileWriter(
+        {
+            "llms_txt_filename": "llms.txt",
+            "llms_txt_title": "Project",
+            "llms_txt_index_max_entries": 3,
+        },
+        str(tmp_path),
+        MockApp(),
+    )
+    # Only indexes written by a previous build are removed
+    (tmp_path / "doctrees").mkdir()
+    (tmp_path / "doctrees" / "llms-txt-manifest.json").write_text(
+        '{"indexes": ["llms/removed.txt"]}'
+    )
+    (tmp_path / "llms").mkdir()
+    (tmp_path / "llms" / "removed.txt").write_text("stale")
+    (tmp_path / "llms" / "notes.txt").write_text("not ours")
+    titles = {"guide": "Guide", "api/index": "API"}
+    assert writer.write_nested_index(tree, titles)
+
+    assert sorted(p.name for p in (tmp_path / "llms").iterdir()) == [
+        "api.2.txt",
+        "api.txt",
+        "guide.txt",
+        "notes.txt",
+    ]
+    root = (tmp_path / "llms.txt").read_text()
+    assert root.startswith("# Project\n\n## Indexes\n\n- [Guide](/llms/guide.txt)\n")
+    assert root.endswith("## Docs\n\n- [index](/index.html)\n")
+
+    api_index = (tmp_path / "llms" / "api.txt").read_text()
+    assert api_index.startswith("# API\n\n## Docs\n\n")
+    assert api_index.count("\n- [") == 4
+    assert api_index.endswith("## More\n\n- [API (2)](/llms/api.2.txt)\n")
+    assert "api/b_detail" in (tmp_path / "llms" / "api.2.txt").read_text()
+
+
+def test_pack_parts_by_toctree_priority():
+    """Test filling several budgets at once from the shallowest pages."""
+
+    class MockEnv:
+        all_docs = {}
+        titles = {}
+        metadata = {}
+        toctree_includes = {
+            "index": ["guide", "api/index"],
+            "api/index": ["api/big", "api/small"],
+        }
+
+    manager = LLMSFullManager()
+    manager.set_master_doc("index")
+    manager.set_env(MockEnv())
+    manager.set_config({"llms_txt_exclude": []})
+
+    assert manager.collector.get_toctree_depths() == {
+        "index": 0,
+        "guide": 1,
+        "api/index": 1,
+        "api/big": 2,
+        "api/small": 2,
+    }
+
+    part_sizes = [10, 10, 10, 100, 10, 10]
+    part_docnames = ["index", "guide", "api/index", "api/big", "api/small", None]
+    selections = manager._pack_parts(part_sizes, part_docnames, [25, 40, 1000, None])
+    assert selections == [
+        ([0, 1], 20),
+        ([0, 1, 2, 4], 40),
+        ([0, 1, 2, 3, 4, 5], 150),
+        ([0, 1, 2, 3, 4, 5], 150),
+    ]
+
+    # Weighted pages come first, whatever their toctree depth
+    manager.set_config(
+        {"llms_txt_exclude": [], "llms_txt_full_priorities": {"api/*": 1}}
+    )
+    ((selected, used),) = manager._pack_parts(part_sizes, part_docnames, [30])
+    assert selected == [0, 2, 4]
+    assert used == 30
+
+    # An invalid weight is reported once and skipped, not once per page
+    from unittest.mock import patch
+
+    manager.set_config(
+        {
+            "llms_txt_exclude": [],
+            "llms_txt_full_priorities": {"api/*": "high", "api/small": 1},
+        }
+    )
+    with patch("sphinx_llms_txt.manager.logger.warning") as warning:
+        ((selected, used),) = manager._pack_parts(part_sizes, part_docnames, [30])
+    assert warning.call_count == 1
+    assert selected == [0, 1, 4]
+
+    # Dropped code files are reported along with the dropped pages
+    manager.set_config({"llms_txt_exclude": []})
+    parts = ["Index", "Guide", "API", "Big\n" * 99, "Small", "Code"]
+    with patch("sphinx_llms_txt.manager.logger.info") as info:
+        kept_parts, kept_docnames, lines = manager._pack_to_size(
+            parts, part_docnames, 4
+        )
+    assert kept_docnames == ["index", "guide", "api/index", "api/small"]
+    assert lines == 4
+    assert info.call_args[0][0].endswith("leaving out: api/big, code files")
@@ -0,0 +1,181 @@
+"""Test regenerating the llms files from an existing build."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from sphinx.testing.util import SphinxTestApp, _clean_up_global_state
+
+from sphinx_llms_txt import plan, regenerate
+from sphinx_llms_txt.cli import main
+
+
+@pytest.fixture
+def snapshot_build(temp_dir, rootdir):
+    """Build the basic project with a snapshot and return the output directory."""
+    app = SphinxTestApp(
+        srcdir=rootdir / "basic",
+        builddir=temp_dir,
+        buildername="html",
+        freshenv=True,
+        confoverrides={"llms_txt_snapshot": True},
+    )
+    app.build()
+    yield Path(app.outdir)
+
+    # Custom cleanup to avoid missing_ok issue
+    sys.path[:] = app._saved_path
+    _clean_up_global_state()
+
+    # Safe unlink
+    if hasattr(app, "docutils_conf_path") and app.docutils_conf_path.exists():
+        app.docutils_conf_path.unlink()
+
+
+def test_regenerate_reproduces_build(snapshot_build):
+    """Test that regenerating without overrides writes the same files."""
+    outdir = snapshot_build
+    # The snapshot is kept with the doctrees, out of the published output
+    assert (outdir.parent / "doctrees" / "llms-txt-snapshot.json").exists()
+    assert not list(outdir.glob("*snapshot*"))
+    llms_txt = (outdir / "llms.txt").read_text()
+    llms_full = (outdir / "test-llms-full.txt").read_text()
+
+    (outdir / "llms.txt").unlink()
+    (outdir / "test-llms-full.txt").unlink()
+    regenerate(outdir)
+
+    assert (outdir / "llms.txt").read_text() == llms_txt
+    assert (outdir / "test-llms-full.txt").read_text() == llms_full
+
+
+def test_regenerate_with_overrides(snapshot_build):
+    """Test that configuration overrides apply without a Sphinx build."""
+    outdir = snapshot_build
+    assert "Page 1 Title" in (outdir / "test-llms-full.txt").read_text()
+
+    regenerate(outdir, {"llms_txt_exclude": ["page1"]})
+
+    assert "Page 1 Title" not in (outdir / "test-llms-full.txt").read_text()
+    assert "page1" not in (outdir / "llms.txt").read_text()
+    # Pages ignored through metadata stay ignored
+    assert "page_ignored_metadata" not in (outdir / "llms.txt").read_text()
+
+    with pytest.raises(ValueError, match="Unknown configuration value"):
+        regenerate(outdir, {"llms_txt_not_a_setting": True})
+
+
+def test_cli(snapshot_build, tmp_path, capsys):
+    """Test the python -m sphinx_llms_txt command line."""
+    outdir = snapshot_build
+
+    assert main([str(outdir), "-D", "llms_txt_full_filename=other-full.txt"]) == 0
+    assert (outdir / "other-full.txt").exists()
+
+    assert main([str(tmp_path)]) == 1
+    assert "No build snapshot found" in capsys.readouterr().err
+
+
+def test_plan_reports_without_writing(snapshot_build):
+    """Test that planning estimates sizes and the size policy outcome."""
+    outdir = snapshot_build
+    llms_full = outdir / "test-llms-full.txt"
+    mtime = llms_full.stat().st_mtime_ns
+
+    report = plan(outdir, {"llms_txt_exclude": ["page2"]})
+
+    docnames = [page["docname"] for page in report["pages"]]
+    assert docnames[0] == "index"
+    assert "page1" in docnames
+    assert report["excluded"] == ["page2"]
+    assert "page_ignored_metadata" in report["ignored"]
+    page1 = report["pages"][docnames.index("page1")]
+    assert page1["bytes"] == (outdir / "_sources" / "page1.rst.txt").stat().st_size
+    assert report["totals"]["bytes"] == sum(p["bytes"] for p in report["pages"])
+    assert report["size_policy"]["outcome"] == "write"
+    assert llms_full.stat().st_mtime_ns == mtime
+
+    report = plan(
+        outdir, {"llms_txt_full_max_size": 5, "llms_txt_full_size_policy": "info_note"}
+    )
+    assert report["size_policy"]["exceeded"]
+    assert report["size_policy"]["first_overflow"] == "index"
+    assert report["size_policy"]["outcome"] == "placeholder"
+    assert not any(page["within_limit"] for page in report["pages"])
+
+    report = plan(
+        outdir,
+        {
+            "llms_txt_full_max_size": 40,
+            "llms_txt_full_size_policy": "info_pack",
+            "llms_txt_full_priorities": {"index": -1},
+        },
+    )
+    assert report["size_policy"]["outcome"] == "pack"
+    assert "index" in report["size_policy"]["dropped"]
+    kept = [page for page in report["pages"] if page["within_limit"]]
+    assert kept and sum(page["lines"] for page in kept) <= 40
+
+
+def test_plan_leaves_files_untouched(snapshot_build):
+    """Test that planning doesn't write anything, not even caches."""
+    build_dir = snapshot_build.parent
+    (build_dir / "doctrees" / "llms-txt-page-order.json").unlink()
+
+    def list_files():
+        return {
+            path: path.stat().st_mtime_ns
+            for path in build_dir.rglob("*")
+            if path.is_file()
+        }
+
+    before = list_files()
+    plan(snapshot_build, {"llms_txt_exclude": ["page2"]})
+    assert list_files() == before
+
+
+def test_cli_plan(snapshot_build, capsys):
+    """Test printing the plan report from the command line."""
+    import json
+
+    assert main([str(snapshot_build), "--plan"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["output"] == "test-llms-full.txt"
+
+
+def test_regenerate_restored_artifact(snapshot_build, tmp_path):
+    """Test regenerating an output directory copied away from its build."""
+    import json
+    import shutil
+
+    snapshot_path = snapshot_build.parent / "doctrees" / "llms-txt-snapshot.json"
+    snapshot = json.loads(snapshot_path.read_text())
+    assert snapshot["doctreedir"]["relative"] == "../doctrees"
+
+    # The whole build directory moved: the relative paths are used
+    build_dir = tmp_path / "moved"
+    shutil.copytree(snapshot_build.parent, build_dir)
+    doctrees = build_dir / "doctrees"
+    (doctrees / "llms-txt-cache.json").unlink()
+    regenerate(build_dir / "html")
+    assert (doctrees / "llms-txt-cache.json").exists()
+
+    # Only the output directory and snapshot from another machine: the
+    # doctree caches are skipped instead of being created at the original
+    # location
+    outdir = tmp_path / "artifact" / "html"
+    shutil.copytree(snapshot_build, outdir)
+    missing = tmp_path / "elsewhere" / "doctrees"
+    snapshot["doctreedir"] = {"relative": None, "absolute": str(missing)}
+    copied_snapshot = tmp_path / "snapshot.json"
+    copied_snapshot.write_text(json.dumps(snapshot))
+    llms_full = (outdir / "test-llms-full.txt").read_text()
+    (outdir / "test-llms-full.txt").unlink()
+
+    with pytest.raises(FileNotFoundError):
+        regenerate(outdir)
+    assert main([str(outdir), "--snapshot", str(copied_snapshot)]) == 0
+
+    assert (outdir / "test-llms-full.txt").read_text() == llms_full
+    assert not (tmp_path / "elsewhere").exists()
+    assert sorted(p.name for p in (tmp_path / "artifact").iterdir()) == ["html"]
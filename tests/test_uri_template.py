@@ -173,3 +173,68 @@ def test_uri_template_invalid_fallback(tmp_path):
 
     # Should fallback to default sources template
     assert "- [Home Page](https://example.com/_sources/index.rst.txt)" in content
+
+
+def test_compiled_uri_template_matches_str_format():
+    """Test that the compiled formatter renders the same URIs as str.format."""
+    writer = FileWriter({})
+
+    templates = [
+        "{base_url}_sources/{docname}{suffix}{sourcelink_suffix}",
+        "{base_url}{docname}.html",
+        "{base_url}{{literal}}/{docname!s}{suffix:>4}{sourcelink_suffix}",
+    ]
+    base_url = "https://example.com/{weird}/"
+    for template in templates:
+        format_uri = writer._compile_uri_template(template, base_url, ".txt")
+        for docname, suffix in [("index", ".rst"), ("guide/intro", "")]:
+            assert format_uri(docname=docname, suffix=suffix) == template.format(
+                base_url=base_url,
+                docname=docname,
+                suffix=suffix,
+                sourcelink_suffix=".txt",
+            )
+
+
+def test_legacy_and_tuple_page_order_render_identically(tmp_path):
+    """Test that plain docname lists render like (docname, None) tuples."""
+    writer = FileWriter({"llms_txt_filename": "llms.txt"}, str(tmp_path))
+    page_titles = {"index": "Home Page"}
+
+    writer.write_verbose_info_to_file(["index", "about"], page_titles)
+    legacy = (tmp_path / "llms.txt").read_text()
+
+    writer.write_verbose_info_to_file([("index", None), ("about", None)], page_titles)
+    assert (tmp_path / "llms.txt").read_text() == legacy
+    assert "- [about](/about.html)\n" in legacy
+
+
+def test_uri_variants_written_in_one_pass(tmp_path):
+    """Test that llms_txt_uri_variants writes one file per template."""
+    config = {
+        "llms_txt_filename": "llms.txt",
+        "llms_txt_uri_variants": [
+            ("llms.md.txt", "{base_url}{docname}.html.md"),
+            ("llms.rst.txt", "{base_url}{docname}.rst"),
+            ("llms.bad.txt", "{base_urll}{docname}"),
+        ],
+        "html_baseurl": "https://example.com",
+    }
+    writer = FileWriter(config, str(tmp_path))
+
+    writer.write_verbose_info_to_file(
+        [("index", ".rst"), ("guide/intro", ".rst")],
+        {"index": "Home Page", "guide/intro": "Intro"},
+    )
+
+    default = (tmp_path / "llms.txt").read_text()
+    markdown = (tmp_path / "llms.md.txt").read_text()
+    rst = (tmp_path / "llms.rst.txt").read_text()
+
+    assert "- [Intro](https://example.com/guide/intro.html)" in default
+    assert "- [Intro](https://example.com/guide/intro.html.md)" in markdown
+    assert "- [Intro](https://example.com/guide/intro.rst)" in rst
+    # Headers are identical, only the links differ
+    assert markdown.split("## Docs")[0] == default.split("## Docs")[0]
+    # Invalid templates are skipped
+    assert not (tmp_path / "llms.bad.txt").exists()